@@ -4,18 +4,75 @@ import sys
 class Config:
     def __init__(self):
         """
-        Inicializa a classe Config com as configurações padrão e configura o manipulador de sinal.
+        Inicializa a classe Config com as configurações padrão. O manipulador de sinal é
+        instalado apenas pela aplicação, com install_signal_handler, e não na importação.
         """
         self.tempoatencao = 8
         self.monitor_to_use = 2  # 1 para monitor primário, 2 para monitor secundário
+        self.open_windows = []  # Janelas fechadas ao encerrar o programa
+        self.active_loop = None  # Loop principal em execução, encerrado por SIGINT ou Esc para um desligamento ordenado
+        self.lane_rows = 2  # Número de janelas de caixa empilhadas em cada coluna da tela
+        self.monitor_check_interval = 10  # Segundos entre as verificações de mudança de monitores (0 desativa)
+        self.max_lines = 2000  # Máximo de linhas de transação mantidas em memória por caixa
+        self.visible_lines = 200  # Linhas finais enviadas ao canvas a cada atualização
+        self.max_fps = 20  # Máximo de redesenhos por segundo de cada canvas
+        self.duplicate_window = 0.5  # Segundos em que a repetição da última mensagem de um caixa é contada como duplicada nas métricas (0 desativa)
+        self.queue_max_messages = 500  # Máximo de mensagens pendentes de exibição por caixa
+        self.queue_overload_policy = 'coalesce'  # Com a fila cheia: 'drop_oldest', 'coalesce' ou 'block' (só fora da recepção, ex.: reprodução)
+        self.queue_block_timeout = 0.05  # Espera máxima, em segundos, por espaço na fila na política 'block'
+        self.virtual_lines = True  # Desenha só as linhas visíveis, um item por linha, em vez de um único texto
+        self.log_flush_interval = 1.0  # Segundos entre as gravações em lote dos logs de transação
+        self.log_fsync = False  # Força cada lote ao disco (os.fsync)
+        self.log_max_bytes = 50 * 1024 * 1024  # Tamanho de rotação dos logs (0 desativa)
+        self.log_rotate_daily = True  # Rotaciona os logs na virada do dia
+        self.log_compress = True  # Compacta com gzip os logs rotacionados
+        self.extra_dvr_targets = []  # Gravadores adicionais (ip, porta) que recebem as mensagens de todos os caixas
+        self.capture_file = None  # Arquivo de captura binária de todos os datagramas recebidos (None desativa)
+        self.capture_flush_interval = 1.0  # Segundos entre as descargas da captura para o disco
+        self.ingest_process = False  # Executa a recepção e o repasse ao DVR em um processo separado
+        self.ingest_ring_size = 4 * 1024 * 1024  # Tamanho, em bytes, do anel de mensagens entre os processos
+        self.ingest_metrics_interval = 1.0  # Segundos entre os envios das métricas do processo de recepção
+        self.metrics_enabled = False  # Coleta contadores e latências por estágio do pipeline
+        self.metrics_port = 0  # Porta do endpoint local /metrics (0 desativa)
+        self.metrics_file = None  # Arquivo para gravação periódica das métricas (None desativa)
+        self.metrics_interval = 10  # Segundos entre gravações do arquivo de métricas
+        # Palavras-chave de cada tipo de evento do PDV, reconhecidas na chegada da mensagem
+        self.event_keywords = {
+            'transaction': ["PDV", "Trans", "Atend"],  # Início de transação/atendimento
+            'report': ["Relatorio", "Gerencial"],  # Relatórios, que encerram o monitoramento
+        }
+        # Identificadores extraídos da abertura de transação para o índice dos logs (primeiro grupo = valor)
+        self.transaction_id_patterns = {
+            'pdv': r"PDV\s*(\d+)",
+            'transaction': r"Trans\w*\s*(\d+)",
+            'operator': r"Atend\w*\s*(\S+)",
+        }
+        self.startup_report = False  # Exibe o tempo de cada etapa da inicialização até o primeiro quadro
+        self.memory_tracing = False  # Liga o tracemalloc desde o início, para os relatórios de memória
+        self.memory_report_dir = '.'  # Diretório dos relatórios de memória gravados por sinal
+
+    def install_signal_handler(self):
+        """
+        Instala o manipulador de SIGINT que fecha as janelas e encerra o programa e o de
+        SIGUSR1 (SIGBREAK, Ctrl+Break, no Windows) que grava um relatório de memória.
+        """
         signal.signal(signal.SIGINT, self.signal_handler)
+        memory_signal = getattr(signal, 'SIGUSR1', None) or getattr(signal, 'SIGBREAK', None)
+        if memory_signal is not None:
+            signal.signal(memory_signal, self.memory_signal_handler)
 
     def close_window(self, *roots):
         """
         Fecha as janelas e encerra o programa.
 
+        Com um loop principal em execução, apenas o encerra: quem o executa faz o desligamento
+        (gravação dos logs pendentes, fechamento dos arquivos) depois que o loop retorna.
+
         :param roots: As janelas a serem fechadas.
         """
+        if self.active_loop is not None:
+            self.active_loop.stop()
+            return
         for root in roots:
             root.quit()
         sys.exit(0)
@@ -27,9 +84,17 @@ class Config:
         :param sig: O sinal recebido.
         :param frame: O frame atual.
         """
-        from ui.interface import Interface
-        interface = Interface.get_instance()
-        self.close_window(interface.root1, interface.root2, interface.root3, interface.root4)
+        self.close_window(*self.open_windows)
+
+    def memory_signal_handler(self, sig, frame):
+        """
+        Manipulador de sinal que grava o relatório de memória da instância em execução.
+
+        :param sig: O sinal recebido.
+        :param frame: O frame atual.
+        """
+        from utils.memory_probe import memory_probe
+        memory_probe.dump(self.memory_report_dir)
 
 # Instância global da classe Config
 config_instance = Config()
@@ -0,0 +1,17 @@
+class LaneState:
+    __slots__ = ('name', 'monitoring', 'alert_active', 'last_activity', 'last_hash', 'last_hash_at', 'deadline', 'frame_started_at')
+
+    def __init__(self, name):
+        """
+        Estado de exibição de um caixa, mantido pelo pipeline entre as mensagens e atualizado no lugar.
+
+        :param name: O nome do caixa.
+        """
+        self.name = name
+        self.monitoring = False  # Há transação em andamento sujeita ao alerta de inatividade
+        self.alert_active = False  # O alerta de inatividade está sendo exibido
+        self.last_activity = 0.0  # Instante da última mensagem, em time.monotonic()
+        self.last_hash = None  # Hash dos bytes da última mensagem distinta, para contar as repetições (métricas)
+        self.last_hash_at = 0.0  # Instante da última mensagem distinta, em time.monotonic()
+        self.deadline = None  # Prazo de inatividade agendado, em time.monotonic(), ou None
+        self.frame_started_at = None  # Instante de enfileiramento da mensagem mais antiga do quadro (métricas)
@@ -0,0 +1,102 @@
+import json
+import os
+
+LANES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lanes.json')
+
+class Lane:
+    def __init__(self, index, name, remote_ip, remote_port, local_port, log_file, targets=()):
+        """
+        Representa um caixa (PDV) monitorado.
+
+        :param index: A posição do caixa na lista de configuração.
+        :param name: O nome do caixa, usado para identificar sua janela.
+        :param remote_ip: O endereço IP de origem das mensagens do PDV.
+        :param remote_port: A porta de origem das mensagens do PDV.
+        :param local_port: A porta local usada no repasse ao DVR.
+        :param log_file: O arquivo onde as transações do caixa são salvas.
+        :param targets: Os destinos (ip, porta) do repasse; vazio para usar o DVR padrão.
+        """
+        self.index = index
+        self.name = name
+        self.remote_ip = remote_ip
+        self.remote_port = remote_port
+        self.local_port = local_port
+        self.log_file = log_file
+        self.targets = tuple(targets)
+
+    @property
+    def addr(self):
+        """
+        Retorna o endereço (ip, porta) de origem das mensagens do caixa.
+        """
+        return (self.remote_ip, self.remote_port)
+
+class LaneRegistry:
+    def __init__(self, lanes):
+        """
+        Inicializa o registro de caixas, indexado pelo endereço de origem e pelo nome.
+
+        :param lanes: Os caixas configurados, na ordem de exibição.
+        """
+        self.lanes = list(lanes)
+        if not self.lanes:
+            raise ValueError("Nenhum caixa configurado")
+        self.by_addr = {}
+        self.by_name = {}
+        for lane in self.lanes:
+            if lane.addr in self.by_addr:
+                raise ValueError(f"Endereço de origem duplicado: {lane.addr}")
+            if lane.name in self.by_name:
+                raise ValueError(f"Nome de caixa duplicado: {lane.name}")
+            self.by_addr[lane.addr] = lane
+            self.by_name[lane.name] = lane
+
+    @classmethod
+    def load(cls, path=LANES_FILE):
+        """
+        Carrega o registro de caixas de um arquivo JSON.
+
+        :param path: O caminho do arquivo de configuração.
+        :return: O registro carregado.
+        """
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+        lanes = []
+        for index, item in enumerate(data['lanes']):
+            lanes.append(Lane(
+                index,
+                item.get('name', f"pdv{index + 1}"),
+                item['remote_ip'],
+                int(item['remote_port']),
+                int(item['local_port']),
+                item.get('log_file', f"screen{index + 1}_log.txt"),
+                [(target['ip'], int(target['port'])) for target in item.get('targets', [])],
+            ))
+        return cls(lanes)
+
+    def lookup(self, addr):
+        """
+        Localiza o caixa correspondente a um endereço de origem.
+
+        :param addr: O endereço (ip, porta) de origem.
+        :return: O caixa correspondente ou None se o endereço não for conhecido.
+        """
+        return self.by_addr.get(addr[:2])
+
+    def get(self, name):
+        """
+        Localiza um caixa pelo nome.
+
+        :param name: O nome do caixa.
+        :return: O caixa correspondente ou None.
+        """
+        return self.by_name.get(name)
+
+    def __iter__(self):
+        return iter(self.lanes)
+
+    def __len__(self):
+        return len(self.lanes)
+
+# Instância global da classe LaneRegistry
+lane_registry = LaneRegistry.load()
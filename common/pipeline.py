@@ -0,0 +1,194 @@
+import threading
+import time
+from common.config import config_instance
+from common.lane_state import LaneState
+from utils.helpers import LineStore
+from utils.log_writer import LogWriter
+from utils.memory_probe import memory_probe
+from utils.metrics import metrics_instance
+from utils.timers import DeadlineScheduler
+
+class Pipeline:
+    def __init__(self, communication, renderer, loop):
+        """
+        Inicializa o pipeline fila → classificação → exibição → log, independente do Tk.
+
+        :param communication: A comunicação que recebe as mensagens e repassa ao DVR.
+        :param renderer: O renderizador que exibe os caixas (Interface, NullRenderer, StreamRenderer...).
+        :param loop: O loop que executa o pipeline (TkLoop ou EventLoop).
+        """
+        self.communication = communication
+        self.renderer = renderer
+        self.loop = loop
+        self.lanes = communication.lanes
+        metrics_instance.set_gauge('message_queue_depth', communication.message_queue.qsize)
+        self.TRANSACTION = communication.classifier.flag('transaction')
+        self.REPORT = communication.classifier.flag('report')
+        self.log_writer = LogWriter(
+            config_instance.log_flush_interval,
+            config_instance.log_fsync,
+            config_instance.log_max_bytes,
+            config_instance.log_rotate_daily,
+            config_instance.log_compress,
+        )
+        self.line_store = LineStore(
+            {lane.name: lane.log_file for lane in self.lanes},
+            config_instance.max_lines,
+            config_instance.visible_lines,
+            self.log_writer,
+            config_instance.transaction_id_patterns,
+        )
+        self.frame_interval = 1.0 / config_instance.max_fps
+        self.dirty_lanes = set()
+        self.states = {lane.name: LaneState(lane.name) for lane in self.lanes}
+        self.render_pending = False
+        self.last_render_time = 0.0
+        self.wakeup_pending = False
+        self.dispatching = threading.Event()  # Sinalizado quando o despertar por mensagem está registrado
+        self.inactivity_timers = DeadlineScheduler(loop, self.on_inactivity)
+        memory_probe.loop = loop
+        memory_probe.add_counter('queue_depth', communication.message_queue.qsize)
+        memory_probe.add_counter('pending_callbacks', loop.pending)
+        memory_probe.add_counter('inactivity_deadlines', lambda: len(self.inactivity_timers))
+        memory_probe.add_counter('buffered_lines', lambda: sum(len(lines) for lines in self.line_store.line_buffers.values()))
+
+    def start(self):
+        """
+        Inicia o gravador de logs e agenda o início do consumo da fila para quando o loop estiver em execução.
+        """
+        self.log_writer.start()
+        self.loop.after(0, self.start_dispatch)
+
+    def close(self):
+        """
+        Desliga o despertar por mensagem e grava os logs pendentes. Pode ser chamado mais de uma vez.
+        """
+        self.communication.on_messages = None
+        self.log_writer.close()
+
+    def start_dispatch(self):
+        """
+        Registra o despertar por mensagem na comunicação, já com o loop em execução,
+        e processa o que tiver chegado antes disso.
+        """
+        self.communication.on_messages = self.wakeup
+        self.dispatching.set()
+        self.process_queue()
+
+    def wakeup(self):
+        """
+        Acorda o loop para consumir a fila. Chamado pela thread de rede, que não espera pelo loop.
+
+        Apenas um despertar fica pendente por vez; os lotes seguintes são consumidos por ele.
+        """
+        if self.wakeup_pending:
+            return
+        self.wakeup_pending = True
+        self.loop.call_from_thread(self.process_queue)
+
+    def process_queue(self):
+        """
+        Processa a fila de mensagens e atualiza os caixas correspondentes.
+        """
+        # Limpa o indicador antes de drenar, para que mensagens novas gerem outro despertar
+        self.wakeup_pending = False
+        message_queue = self.communication.message_queue
+        states = self.states
+        duplicate_window = config_instance.duplicate_window
+        measure = metrics_instance.enabled
+        while not message_queue.empty():
+            lane, data, tags, enqueued_at = message_queue.get()
+            state = states.get(lane)
+            if state is None:
+                continue
+            now = time.monotonic()
+            if measure:
+                # A repetição da última mensagem dentro da janela é apenas contada: ela entra no
+                # buffer e no log como as demais, e o limite de quadros já evita redesenhos extras
+                message_hash = hash(data)
+                if message_hash == state.last_hash and now - state.last_hash_at < duplicate_window:
+                    metrics_instance.inc('messages_duplicate', lane)
+                else:
+                    state.last_hash = message_hash
+                    state.last_hash_at = now
+                metrics_instance.observe('queue', time.perf_counter() - enqueued_at)
+                if state.frame_started_at is None:
+                    state.frame_started_at = enqueued_at
+            # A decodificação é feita aqui, na thread do loop; a thread de rede trabalha só com bytes
+            self.process_message(state, data.decode('utf-8', errors='replace'), tags, now)
+
+        if self.dirty_lanes:
+            self.schedule_render()
+
+    def process_message(self, state, message, tags, now):
+        """
+        Processa uma mensagem recebida, atualizando o estado do caixa, e o marca para ser redesenhado.
+
+        :param state: O estado do caixa.
+        :param message: A mensagem a ser processada.
+        :param tags: Os tipos de evento marcados na mensagem pelo classificador.
+        :param now: O instante do processamento, em time.monotonic().
+        """
+        lane = state.name
+        new_transaction = tags & self.TRANSACTION
+        self.line_store.apply_message(lane, message, new_transaction, tags)
+        self.renderer.show_message(lane, message, tags)
+        self.dirty_lanes.add(lane)
+        state.last_activity = now
+
+        if state.alert_active:
+            state.alert_active = False
+            self.renderer.stop_alert(lane)
+
+        if new_transaction:
+            state.monitoring = True
+
+        if not tags & self.REPORT and state.monitoring:
+            # Adia o prazo de inatividade do caixa; um único prazo por caixa fica agendado
+            state.deadline = now + config_instance.tempoatencao
+            self.inactivity_timers.set(lane, state.deadline)
+        else:
+            state.monitoring = False
+            if state.deadline is not None:
+                state.deadline = None
+                self.inactivity_timers.cancel(lane)
+
+    def on_inactivity(self, lane):
+        """
+        Dispara o alerta de inatividade de um caixa. Chamado pelo agendador de prazos.
+
+        :param lane: O nome do caixa sem eventos recentes.
+        """
+        state = self.states[lane]
+        state.deadline = None
+        if not state.alert_active:
+            state.alert_active = True
+            self.renderer.start_alert(lane)
+
+    def schedule_render(self):
+        """
+        Agenda o próximo quadro de desenho, respeitando o limite de quadros por segundo.
+        """
+        if self.render_pending:
+            return
+        self.render_pending = True
+        delay = self.last_render_time + self.frame_interval - time.monotonic()
+        self.loop.after(max(0, int(delay * 1000)), self.render_frame)
+
+    def render_frame(self):
+        """
+        Redesenha uma única vez cada caixa que recebeu mensagens desde o último quadro.
+        """
+        self.render_pending = False
+        self.last_render_time = time.monotonic()
+        dirty_lanes, self.dirty_lanes = self.dirty_lanes, set()
+        measure = metrics_instance.enabled
+        for lane in dirty_lanes:
+            self.renderer.render_lane(lane, self.line_store.get_visible_text(lane))
+            if measure:
+                rendered_at = time.perf_counter()
+                metrics_instance.inc('frames_rendered', lane)
+                state = self.states[lane]
+                enqueued_at, state.frame_started_at = state.frame_started_at, None
+                if enqueued_at is not None:
+                    metrics_instance.observe('render', rendered_at - enqueued_at)
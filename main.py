@@ -1,31 +1,131 @@
+from utils.startup import startup_report
+import argparse
+import sys
 import threading
-from network.communication import communication_instance
-from mouse_handler.mouse_events import mouse_handler_instance
-from ui.interface import Interface
+from common.config import config_instance
+from common.pipeline import Pipeline
+from utils.metrics import metrics_instance
 
 class MainApp:
-    def __init__(self):
+    def __init__(self, headless=False, output=None):
         """
         Inicializa a aplicação principal, configurando a interface e iniciando as threads.
+
+        Cada componente é criado explicitamente aqui, na ordem necessária para exibir as
+        janelas o quanto antes; as importações pesadas (Tk, pynput) são feitas sob demanda.
+
+        :param headless: Executa o pipeline sem tela, apenas repassando ao DVR e gravando logs.
+        :param output: No modo sem tela, '-' para exibir as mensagens no terminal ou o caminho de um arquivo.
         """
-        self.interface = Interface.get_instance()
+        startup_report.mark("importações")
+        config_instance.install_signal_handler()
+        if config_instance.memory_tracing:
+            from utils.memory_probe import memory_probe
+            memory_probe.start()
+        self.headless = headless
+        if headless:
+            from ui.renderer import NullRenderer, StreamRenderer
+            from utils.event_loop import EventLoop
+            if output is None:
+                self.renderer = NullRenderer()
+            elif output == '-':
+                self.renderer = StreamRenderer(sys.stdout)
+            else:
+                self.renderer = StreamRenderer(open(output, 'a', encoding='utf-8'), owns_stream=True)
+            self.loop = EventLoop()
+        else:
+            Interface = startup_report.timed_import('ui.interface').Interface
+            TkLoop = startup_report.timed_import('ui.tk_loop').TkLoop
+            self.interface = Interface.get_instance()
+            self.renderer = self.interface
+            self.loop = TkLoop(self.interface.main_window)
+        startup_report.mark("interface")
+        if config_instance.ingest_process:
+            from network.ingest_process import IngestProcess
+            self.communication = IngestProcess()
+        else:
+            Communication = startup_report.timed_import('network.communication').Communication
+            self.communication = Communication.get_instance()
+        self.pipeline = Pipeline(self.communication, self.renderer, self.loop)
+        self.pipeline.start()
+        startup_report.mark("pipeline")
+        self.start_metrics()
         self.start_threads()
+        startup_report.mark("threads")
         self.start_mainloop()
 
+    def start_metrics(self):
+        """
+        Liga a coleta de métricas e seus exportadores, conforme a configuração.
+        """
+        metrics_instance.enabled = config_instance.metrics_enabled
+        if not metrics_instance.enabled:
+            return
+        if config_instance.metrics_port:
+            metrics_instance.serve(config_instance.metrics_port)
+        if config_instance.metrics_file:
+            metrics_instance.start_file_dump(config_instance.metrics_file, config_instance.metrics_interval)
+
     def start_threads(self):
         """
         Inicia as threads para comunicação e manipulação de eventos do mouse.
         """
-        threading.Thread(target=communication_instance.listen_and_update, daemon=True).start()
-        threading.Thread(target=mouse_handler_instance.mouse_listener, daemon=True).start()
+        threading.Thread(target=self.communication.listen_and_update, daemon=True).start()
+        if not self.headless:
+            from mouse_handler.mouse_events import MouseHandler
+            threading.Thread(target=MouseHandler.get_instance().mouse_listener, args=(self.loop,), daemon=True).start()
 
     def start_mainloop(self):
         """
-        Inicia o loop principal da interface gráfica.
+        Inicia o loop principal (da interface gráfica ou do modo sem tela) e, quando ele
+        retorna (SIGINT, Esc), faz o desligamento.
+        """
+        config_instance.active_loop = self.loop
+        self.loop.after(0, self.on_first_frame)
+        try:
+            self.loop.run()
+        finally:
+            # O loop continua registrado durante o desligamento: um novo SIGINT apenas o encerra de novo
+            self.shutdown()
+            config_instance.active_loop = None
+
+    def shutdown(self):
         """
-        for root in [self.interface.root1, self.interface.root2, self.interface.root3, self.interface.root4]:
-            root.after(100, self.interface.process_queue)
-        self.interface.root1.mainloop()
+        Encerra a recepção e o repasse ao DVR, enviando o que estiver pendente, o pipeline,
+        gravando os logs pendentes, e o renderizador.
+        """
+        self.communication.close()
+        self.pipeline.close()
+        self.renderer.close()
+
+    def on_first_frame(self):
+        """
+        Marca o primeiro quadro exibido e, se configurado, exibe o relatório de inicialização.
+        """
+        if not self.headless:
+            self.interface.main_window.update_idletasks()
+        startup_report.mark("primeiro quadro")
+        if config_instance.startup_report:
+            print(startup_report.render(), file=sys.stderr)
+
+def parse_args(argv=None):
+    """
+    Lê os argumentos de linha de comando.
+
+    :param argv: A lista de argumentos; por padrão, sys.argv.
+    :return: Os argumentos lidos.
+    """
+    parser = argparse.ArgumentParser(description="Sobreposição de cupons dos PDVs e repasse ao DVR.")
+    parser.add_argument('--headless', action='store_true', help="executa sem tela, apenas repassando ao DVR e gravando logs")
+    parser.add_argument('--output', help="no modo sem tela, '-' para exibir as mensagens no terminal ou o caminho de um arquivo")
+    parser.add_argument('--startup-report', action='store_true', help="exibe o tempo de cada etapa da inicialização até o primeiro quadro")
+    parser.add_argument('--trace-memory', action='store_true', help="liga o tracemalloc para os relatórios de memória (SIGUSR1/Ctrl+Break ou /memory)")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    MainApp()
+    args = parse_args()
+    if args.startup_report:
+        config_instance.startup_report = True
+    if args.trace_memory:
+        config_instance.memory_tracing = True
+    MainApp(args.headless, args.output)
@@ -0,0 +1,153 @@
+import bisect
+import mmap
+import os
+import socket
+import struct
+import time
+
+MAGIC = b'SCCAP\x00\x01\x00'  # Identificação e versão do formato de captura
+RECORD_HEADER = struct.Struct('<d4sHHI')  # Instante (time.time), IP, porta, índice do caixa, tamanho
+INDEX_ENTRY = struct.Struct('<Qd')  # Posição do registro no arquivo, instante
+INDEX_INTERVAL = 1024  # Registros entre duas entradas do índice
+NO_LANE = 0xFFFF  # Índice gravado para datagramas de origem desconhecida
+
+class CaptureWriter:
+    def __init__(self, path, flush_interval=1.0):
+        """
+        Grava os datagramas recebidos em um arquivo binário somente de acréscimo, com um índice
+        esparso (posição e instante a cada INDEX_INTERVAL registros) em path + '.idx'.
+
+        :param path: O caminho do arquivo de captura.
+        :param flush_interval: Intervalo máximo, em segundos, entre as descargas para o disco.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.file = open(path, 'ab', buffering=1024 * 1024)
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        else:
+            with open(path, 'rb') as existing:
+                if existing.read(len(MAGIC)) != MAGIC:
+                    self.file.close()
+                    raise ValueError(f"{path} não é um arquivo de captura")
+        self.index_file = open(path + '.idx', 'ab')
+        self.records = 0
+        self.last_flush = time.monotonic()
+
+    def write(self, timestamp, addr, lane, data):
+        """
+        Acrescenta um datagrama à captura.
+
+        :param timestamp: O instante da recepção, em time.time().
+        :param addr: O endereço (ip, porta) de origem.
+        :param lane: O caixa de origem ou None se a origem for desconhecida.
+        :param data: Os bytes recebidos.
+        """
+        if self.records % INDEX_INTERVAL == 0:
+            self.index_file.write(INDEX_ENTRY.pack(self.file.tell(), timestamp))
+        lane_index = NO_LANE if lane is None else lane.index
+        self.file.write(RECORD_HEADER.pack(timestamp, socket.inet_aton(addr[0]), addr[1], lane_index, len(data)))
+        self.file.write(data)
+        self.records += 1
+
+    def flush_if_due(self):
+        """
+        Descarrega os registros pendentes se o intervalo de descarga tiver passado.
+        """
+        now = time.monotonic()
+        if now - self.last_flush >= self.flush_interval:
+            self.flush()
+            self.last_flush = now
+
+    def flush(self):
+        """
+        Descarrega para o sistema operacional os registros e o índice pendentes.
+        """
+        self.file.flush()
+        self.index_file.flush()
+
+    def close(self):
+        """
+        Descarrega e fecha a captura.
+        """
+        self.flush()
+        self.file.close()
+        self.index_file.close()
+
+class CaptureReader:
+    def __init__(self, path):
+        """
+        Lê um arquivo de captura mapeado em memória.
+
+        :param path: O caminho do arquivo de captura.
+        """
+        self.path = path
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} não é um arquivo de captura")
+        self.index = self.load_index()
+
+    def load_index(self):
+        """
+        Carrega o índice esparso, ignorando entradas incompletas ou além do fim da captura.
+
+        :return: Lista de tuplas (instante, posição), em ordem de gravação.
+        """
+        index = []
+        try:
+            with open(self.path + '.idx', 'rb') as index_file:
+                data = index_file.read()
+        except OSError:
+            return index
+        for offset in range(0, len(data) - INDEX_ENTRY.size + 1, INDEX_ENTRY.size):
+            position, timestamp = INDEX_ENTRY.unpack_from(data, offset)
+            if position < len(self.map):
+                index.append((timestamp, position))
+        return index
+
+    def find_offset(self, start):
+        """
+        Retorna a posição a partir da qual estão os registros do instante informado.
+
+        :param start: O instante inicial, em time.time(), ou None para o início da captura.
+        :return: A posição do primeiro registro que pode ser desse instante ou posterior.
+        """
+        if start is None or not self.index:
+            return len(MAGIC)
+        position = bisect.bisect_right(self.index, (start, -1)) - 1
+        return self.index[position][1] if position >= 0 else len(MAGIC)
+
+    def records(self, start=None, end=None):
+        """
+        Percorre os registros da captura em ordem. Um registro incompleto no fim do
+        arquivo (gravação interrompida) encerra a leitura.
+
+        :param start: Instante inicial, em time.time(), ou None para o início.
+        :param end: Instante final, em time.time(), ou None para o fim.
+        :return: Gerador de tuplas (instante, endereço, índice do caixa ou None, bytes).
+        """
+        offset = self.find_offset(start)
+        size = len(self.map)
+        while offset + RECORD_HEADER.size <= size:
+            timestamp, ip, port, lane_index, length = RECORD_HEADER.unpack_from(self.map, offset)
+            data_start = offset + RECORD_HEADER.size
+            offset = data_start + length
+            if offset > size:
+                break
+            if start is not None and timestamp < start:
+                continue
+            if end is not None and timestamp > end:
+                break
+            lane = None if lane_index == NO_LANE else lane_index
+            yield timestamp, (socket.inet_ntoa(ip), port), lane, self.map[data_start:offset]
+
+    def close(self):
+        """
+        Libera o mapeamento e fecha o arquivo.
+        """
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
@@ -1,23 +1,70 @@
+import atexit
+import errno
+import selectors
 import socket
+import threading
 import time
-from queue import Queue
+from common.config import config_instance
+from common.lanes import lane_registry
+from network.capture import CaptureWriter
+from network.forward_worker import ForwardWorker
+from network.forwarder import Forwarder
+from network.lane_queue import LaneQueue
+from network.receive_buffer import ReceiveBuffer
+from utils.classifier import MessageClassifier
+from utils.metrics import metrics_instance
+
+WSAEMSGSIZE = 10040  # Erro do Winsock para datagrama maior que a área de recepção
 
 class Communication:
-    def __init__(self):
+    _instance = None
+
+    def __init__(self, lanes=None):
         """
         Inicializa a classe Communication com as configurações de rede e a fila de mensagens.
+
+        :param lanes: O registro de caixas atendidos; por padrão, o carregado de lanes.json.
         """
         self.IP_DVR = '192.168.101.250'
         self.PORTA_ENV_DVR = 38800
         self.LOCAL_IP = '0.0.0.0'
         self.LOCAL_PORT = 38800
-        self.REMOTE_CONFIGS = [
-            ('192.168.101.131', 8080, 8131, 'root1'),
-            ('192.168.101.132', 8080, 8132, 'root2'),
-            ('192.168.101.133', 8080, 8133, 'root3'),
-            ('192.168.101.134', 8080, 8134, 'root4')
-        ]
-        self.message_queue = Queue()
+        self.RECV_BUFFER_SIZE = 4 * 1024 * 1024  # Tamanho do buffer de recepção do socket (SO_RCVBUF)
+        self.RECV_BATCH_SIZE = 256  # Máximo de datagramas lidos por despertar do seletor
+        self.RECV_BATCH_BYTES = 1024 * 1024  # Espaço pré-alocado para os datagramas de um lote
+        self.MAX_DATAGRAM_SIZE = 64 * 1024  # Maior datagrama aceito; os maiores são truncados e contados
+        self.lanes = lanes if lanes is not None else lane_registry
+        self.classifier = MessageClassifier(config_instance.event_keywords)
+        if config_instance.queue_overload_policy == 'block':
+            # A espera por espaço pararia a recepção e o repasse ao DVR de todos os caixas
+            raise ValueError("A política de sobrecarga 'block' não pode ser usada na recepção; use 'coalesce' ou 'drop_oldest'")
+        self.message_queue = LaneQueue(
+            self.lanes,
+            config_instance.queue_max_messages,
+            config_instance.queue_overload_policy,
+            config_instance.queue_block_timeout,
+            self.classifier.flag('transaction'),
+        )
+        self.forwarder = Forwarder(self.LOCAL_IP)
+        self.forward_worker = None  # Thread de repasse ao DVR, criada em listen_and_update
+        self.on_messages = None  # Chamado após enfileirar cada lote, para acordar o consumidor
+        self.capture = None  # Gravador da captura binária, aberto em listen_and_update se configurado
+        # Par de sockets que acorda o seletor para encerrar a recepção (close)
+        self.stop_reader, self.stop_writer = socket.socketpair()
+        self.listening = False  # listen_and_update foi iniciado
+        self.stopped = threading.Event()  # Sinalizado quando listen_and_update retorna
+        self.closed = False
+
+    @staticmethod
+    def get_instance():
+        """
+        Retorna a instância da comunicação usada pela aplicação, criada no primeiro uso.
+
+        :return: Instância da classe Communication.
+        """
+        if Communication._instance is None:
+            Communication._instance = Communication()
+        return Communication._instance
 
     def send_text(self, data, ip_dvr, porta_env_dvr, porta_envio_local_dvr):
         """
@@ -27,34 +74,180 @@ class Communication:
         :param ip_dvr: O endereço IP do DVR.
         :param porta_env_dvr: A porta de envio do DVR.
         :param porta_envio_local_dvr: A porta de envio local do DVR.
+        :return: True se o envio foi concluído.
+        """
+        if isinstance(data, str):
+            data = data.encode()
+        return self.forwarder.send(data, (ip_dvr, porta_env_dvr), porta_envio_local_dvr)
+
+    def open_forward_sockets(self):
+        """
+        Abre um socket de envio persistente por caixa, usado em todos os repasses ao DVR.
+        """
+        self.forwarder.open_all(lane.local_port for lane in self.lanes)
+
+    def create_forward_worker(self):
+        """
+        Cria a thread de repasse com os destinos de cada caixa: os do próprio caixa (ou o DVR
+        padrão, IP_DVR:PORTA_ENV_DVR) e os gravadores adicionais da configuração.
+
+        :return: O repasse, ainda não iniciado.
+        """
+        extra_targets = [(ip, int(port)) for ip, port in config_instance.extra_dvr_targets]
+        routes = {
+            lane.name: (lane.local_port, list(lane.targets or [(self.IP_DVR, self.PORTA_ENV_DVR)]) + extra_targets)
+            for lane in self.lanes
+        }
+        return ForwardWorker(self.forwarder, routes)
+
+    def create_listen_socket(self):
+        """
+        Cria o socket de escuta não bloqueante com o buffer de recepção configurado.
+
+        :return: O socket UDP pronto para uso com o seletor.
         """
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         try:
-            sock.bind(('0.0.0.0', porta_envio_local_dvr))
-            if isinstance(data, str):
-                data = data.encode()
-            sock.sendto(data, (ip_dvr, porta_env_dvr))
-        except Exception as e:
-            print(f"Erro ao enviar mensagem: {e}")
-        finally:
-            sock.close()
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.RECV_BUFFER_SIZE)
+        except OSError as e:
+            print(f"Não foi possível ajustar o buffer de recepção: {e}")
+        sock.bind((self.LOCAL_IP, self.LOCAL_PORT))
+        sock.setblocking(False)
+        return sock
+
+    def create_receive_buffer(self):
+        """
+        Cria a área de recepção reutilizada por todos os lotes.
+
+        :return: A área de recepção, com o tamanho máximo de datagrama limitado a 64 KiB.
+        """
+        max_datagram = max(1, min(self.MAX_DATAGRAM_SIZE, 64 * 1024))
+        return ReceiveBuffer(self.RECV_BATCH_BYTES, max_datagram)
+
+    def receive_batch(self, sock, receive_buffer):
+        """
+        Lê todos os datagramas pendentes no socket, até o limite de um lote ou da área de recepção.
+
+        :param sock: O socket de escuta não bloqueante.
+        :param receive_buffer: A área de recepção, reiniciada a cada lote.
+        :return: Lista de tuplas (visão dos dados, endereço, truncado) recebidas.
+        """
+        receive_buffer.reset()
+        batch = []
+        for _ in range(self.RECV_BATCH_SIZE):
+            if not receive_buffer.has_room():
+                break
+            try:
+                batch.append(receive_buffer.receive(sock))
+            except BlockingIOError:
+                break
+            except ConnectionResetError:
+                # No Windows um ICMP "port unreachable" anterior aparece aqui; apenas ignora
+                continue
+            except OSError as e:
+                if e.errno not in (errno.EMSGSIZE, WSAEMSGSIZE) and getattr(e, 'winerror', None) != WSAEMSGSIZE:
+                    raise
+                # No Windows o datagrama maior que a área é descartado com erro, sem o endereço de origem
+                print(f"Mensagem maior que {self.MAX_DATAGRAM_SIZE} bytes foi descartada")
+                if metrics_instance.enabled:
+                    metrics_instance.inc('datagrams_truncated', 'desconhecido')
+                continue
+        return batch
+
+    def handle_datagram(self, data, addr, received_at, truncated=False):
+        """
+        Entrega um datagrama recebido ao repasse e o coloca na fila do caixa correspondente,
+        já marcado com os tipos de evento que contém e com o instante de enfileiramento.
+
+        A classificação é feita direto sobre a área de recepção; o repasse e a fila recebem a
+        mesma cópia dos bytes, enviada pela thread de repasse e decodificada apenas pelo consumidor.
+
+        :param data: Os bytes recebidos (visão da área de recepção, válida só durante o lote).
+        :param addr: O endereço (ip, porta) de origem.
+        :param received_at: O instante da leitura do lote, em time.perf_counter().
+        :param truncated: Indica se o datagrama excedeu o tamanho máximo e foi cortado.
+        :return: True se a mensagem foi enfileirada.
+        """
+        lane = self.lanes.lookup(addr)
+        if lane is None:
+            if metrics_instance.enabled:
+                metrics_instance.inc('datagrams_unknown_source', f"{addr[0]}:{addr[1]}")
+            return False
+        if truncated:
+            print(f"Mensagem do {lane.name} maior que {self.MAX_DATAGRAM_SIZE} bytes foi truncada")
+            if metrics_instance.enabled:
+                metrics_instance.inc('datagrams_truncated', lane.name)
+        message = bytes(data)
+        self.forward_worker.put(lane.name, message, received_at)
+        tags = self.classifier.classify(data)
+        enqueued_at = time.perf_counter()
+        if metrics_instance.enabled:
+            metrics_instance.inc('datagrams_received', lane.name)
+            metrics_instance.observe('ingest', enqueued_at - received_at)
+        self.message_queue.put((lane.name, message, tags, enqueued_at))
+        return True
 
     def listen_and_update(self):
         """
-        Escuta mensagens e atualiza as janelas.
-        """
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
-            sock.bind((self.LOCAL_IP, self.LOCAL_PORT))
-            while True:
-                time.sleep(1)
-                data, addr = sock.recvfrom(1024)
-                message = data.decode('utf-8')
-                for remote_ip, remote_port, local_port, root in self.REMOTE_CONFIGS:
-                    if addr[0] == remote_ip and addr[1] == remote_port:
-                        self.send_text(data, self.IP_DVR, self.PORTA_ENV_DVR, local_port)
-                        self.message_queue.put((root, message))
-                        break
-
-# Instância global da classe Communication
-communication_instance = Communication()
-message_queue = communication_instance.message_queue
+        Escuta mensagens e atualiza as janelas, até que close seja chamado.
+
+        O socket é monitorado por um seletor e, a cada despertar, todos os datagramas
+        pendentes são drenados em lote, sem espera fixa entre as leituras. Ao final de cada
+        lote, o repasse ao DVR e o consumidor da fila (on_messages) são acordados. Com a captura
+        ativa, cada datagrama é também gravado no arquivo de captura.
+        """
+        self.listening = True
+        self.open_forward_sockets()
+        self.forward_worker = self.create_forward_worker()
+        self.forward_worker.start()
+        receive_buffer = self.create_receive_buffer()
+        timeout = None
+        if config_instance.capture_file:
+            self.capture = CaptureWriter(config_instance.capture_file, config_instance.capture_flush_interval)
+            atexit.register(self.capture.flush)
+            timeout = config_instance.capture_flush_interval  # Acorda também para descarregar a captura
+        try:
+            with self.create_listen_socket() as sock, selectors.DefaultSelector() as selector:
+                selector.register(sock, selectors.EVENT_READ)
+                selector.register(self.stop_reader, selectors.EVENT_READ)
+                while True:
+                    for key, _mask in selector.select(timeout):
+                        if key.fileobj is self.stop_reader:
+                            return
+                        enqueued = False
+                        batch = self.receive_batch(sock, receive_buffer)
+                        received_at = time.perf_counter()
+                        if self.capture is not None:
+                            captured_at = time.time()
+                            for data, addr, _truncated in batch:
+                                self.capture.write(captured_at, addr, self.lanes.lookup(addr), data)
+                        for data, addr, truncated in batch:
+                            enqueued = self.handle_datagram(data, addr, received_at, truncated) or enqueued
+                        if enqueued:
+                            self.forward_worker.wakeup()
+                        if enqueued and self.on_messages is not None:
+                            self.on_messages()
+                    if self.capture is not None:
+                        self.capture.flush_if_due()
+        finally:
+            self.stopped.set()
+
+    def close(self, timeout=5.0):
+        """
+        Encerra a recepção, envia aos DVRs o que ainda estiver na fila de repasse e fecha os
+        sockets de envio e a captura. Pode ser chamado mais de uma vez.
+
+        :param timeout: A espera máxima pelo fim da recepção, em segundos.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.stop_writer.send(b'\0')
+        if self.listening and not self.stopped.wait(timeout):
+            print("A recepção não terminou no tempo limite")
+        if self.forward_worker is not None:
+            self.forward_worker.close()
+        self.forwarder.close_all()
+        if self.capture is not None and self.stopped.is_set():
+            atexit.unregister(self.capture.flush)
+            self.capture.close()
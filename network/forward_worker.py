@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import deque
+from utils.metrics import metrics_instance
+
+class ForwardWorker:
+    def __init__(self, forwarder, routes):
+        """
+        Repassa as mensagens recebidas aos DVRs/gravadores em uma thread própria, para que a
+        recepção não espere pelos envios.
+
+        A thread de rede apenas acrescenta cada mensagem à fila de repasse e acorda o repasse uma
+        vez por lote; a cada despertar, todas as mensagens pendentes são enviadas a cada destino
+        do caixa. A fila não tem limite: nenhuma mensagem deixa de ser repassada.
+
+        :param forwarder: O encaminhador com os sockets de envio de cada porta local.
+        :param routes: Dicionário nome do caixa → (porta local de envio, lista de destinos (ip, porta)).
+        """
+        self.forwarder = forwarder
+        self.routes = routes
+        self.pending = deque()  # (caixa, bytes da mensagem, instante da recepção)
+        self.wakeup_event = threading.Event()
+        self.running = False
+        self.thread = None
+        targets = {target for _local_port, lane_targets in routes.values() for target in lane_targets}
+        self.sent = dict.fromkeys(targets, 0)
+        self.errors = dict.fromkeys(targets, 0)
+        self.stages = {target: f"forward {target[0]}:{target[1]}" for target in targets}
+        for target in targets:
+            labels = f'target="{target[0]}:{target[1]}"'
+            metrics_instance.set_gauge('forward_target_sent', lambda target=target: self.sent[target], labels)
+            metrics_instance.set_gauge('forward_target_errors', lambda target=target: self.errors[target], labels)
+
+    def start(self):
+        """
+        Inicia a thread de repasse.
+        """
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="Forward", daemon=True)
+        self.thread.start()
+
+    def put(self, lane, data, received_at):
+        """
+        Acrescenta uma mensagem à fila de repasse. Chamado pela thread de rede.
+
+        :param lane: O nome do caixa.
+        :param data: Os bytes da mensagem.
+        :param received_at: O instante da recepção, em time.perf_counter().
+        """
+        self.pending.append((lane, data, received_at))
+
+    def wakeup(self):
+        """
+        Acorda a thread de repasse; chamado uma vez ao final de cada lote recebido.
+        """
+        self.wakeup_event.set()
+
+    def run(self):
+        """
+        Laço da thread de repasse: espera um despertar e envia tudo o que estiver pendente.
+        """
+        while self.running:
+            self.wakeup_event.wait()
+            # Limpa o indicador antes de drenar, para que mensagens novas gerem outro despertar
+            self.wakeup_event.clear()
+            self.drain()
+
+    def drain(self):
+        """
+        Envia as mensagens pendentes a todos os destinos dos seus caixas.
+        """
+        pending = self.pending
+        measure = metrics_instance.enabled
+        while pending:
+            lane, data, received_at = pending.popleft()
+            local_port, targets = self.routes[lane]
+            forwarded = True
+            for target in targets:
+                if self.forwarder.send(data, target, local_port):
+                    self.sent[target] += 1
+                else:
+                    self.errors[target] += 1
+                    forwarded = False
+                if measure:
+                    metrics_instance.observe(self.stages[target], time.perf_counter() - received_at)
+            if measure:
+                metrics_instance.observe('forward', time.perf_counter() - received_at)
+                metrics_instance.inc('datagrams_forwarded' if forwarded else 'forward_errors', lane)
+
+    def close(self):
+        """
+        Encerra a thread de repasse após enviar o que estiver pendente.
+        """
+        self.running = False
+        self.wakeup_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.drain()
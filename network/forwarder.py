@@ -0,0 +1,80 @@
+import socket
+
+class Forwarder:
+    def __init__(self, local_ip='0.0.0.0'):
+        """
+        Inicializa o encaminhador com um socket UDP persistente por porta local.
+
+        :param local_ip: O endereço IP local usado no bind dos sockets de envio.
+        """
+        self.local_ip = local_ip
+        self.sockets = {}
+
+    def open(self, local_port):
+        """
+        Abre (ou reabre) o socket de envio vinculado a uma porta local.
+
+        :param local_port: A porta local de envio.
+        :return: O socket aberto.
+        """
+        self.close(local_port)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.bind((self.local_ip, local_port))
+        except OSError:
+            sock.close()
+            raise
+        self.sockets[local_port] = sock
+        return sock
+
+    def open_all(self, local_ports):
+        """
+        Abre os sockets de envio de todas as portas locais na inicialização.
+
+        :param local_ports: As portas locais de envio.
+        """
+        for local_port in local_ports:
+            try:
+                self.open(local_port)
+            except OSError as e:
+                print(f"Erro ao abrir socket de envio na porta {local_port}: {e}")
+
+    def send(self, data, target, local_port):
+        """
+        Envia um datagrama pelo socket persistente da porta local.
+
+        Em caso de erro o socket é recriado e o envio é tentado mais uma vez.
+
+        :param data: Os bytes a serem enviados.
+        :param target: O endereço (ip, porta) de destino.
+        :param local_port: A porta local de envio.
+        :return: True se o envio foi concluído.
+        """
+        for tentativa in range(2):
+            try:
+                sock = self.sockets.get(local_port)
+                if sock is None:
+                    sock = self.open(local_port)
+                sock.sendto(data, target)
+                return True
+            except OSError as e:
+                print(f"Erro ao enviar mensagem (tentativa {tentativa + 1}): {e}")
+                self.close(local_port)
+        return False
+
+    def close(self, local_port):
+        """
+        Fecha o socket de envio de uma porta local, se existir.
+
+        :param local_port: A porta local de envio.
+        """
+        sock = self.sockets.pop(local_port, None)
+        if sock is not None:
+            sock.close()
+
+    def close_all(self):
+        """
+        Fecha todos os sockets de envio.
+        """
+        for local_port in list(self.sockets):
+            self.close(local_port)
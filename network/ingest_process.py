@@ -0,0 +1,219 @@
+import atexit
+import multiprocessing
+import pickle
+import struct
+import threading
+from common.config import config_instance
+from common.lanes import lane_registry
+from network.shm_ring import SharedRing
+from utils.classifier import MessageClassifier
+from utils.metrics import metrics_instance
+
+RECORD_HEADER = struct.Struct('<HId')  # Índice do caixa, tipos de evento, instante de enfileiramento
+
+class RingWriter:
+    def __init__(self, ring, lanes, notify_conn):
+        """
+        Substitui a fila de mensagens da Communication no processo de recepção,
+        gravando cada mensagem no anel compartilhado.
+
+        :param ring: O anel compartilhado.
+        :param lanes: O registro de caixas.
+        :param notify_conn: A conexão usada para avisar o processo da interface.
+        """
+        self.ring = ring
+        self.lanes = lanes
+        self.notify_conn = notify_conn
+        self.send_lock = threading.Lock()  # Os avisos e as métricas são enviados por threads diferentes
+
+    def put(self, item):
+        """
+        Grava uma mensagem no anel. Se o anel estiver cheio, a mensagem é descartada da
+        exibição e contada no contador do caixa; o repasse ao DVR já foi feito.
+
+        :param item: Tupla (caixa, bytes da mensagem, tipos de evento, instante de enfileiramento).
+        """
+        lane, message, tags, enqueued_at = item
+        index = self.lanes.by_name[lane].index
+        if not self.ring.write(RECORD_HEADER.pack(index, tags, enqueued_at) + message):
+            self.ring.increment(index)
+
+    def notify(self):
+        """
+        Avisa o processo da interface de que há mensagens novas; apenas um aviso fica pendente por vez.
+        """
+        if not self.ring.get(SharedRing.NOTIFY_PENDING):
+            self.ring.set(SharedRing.NOTIFY_PENDING, 1)
+            with self.send_lock:
+                self.notify_conn.send_bytes(b'')
+
+    def send_metrics(self):
+        """
+        Envia ao processo da interface as métricas contadas neste processo. Um aviso é uma
+        mensagem vazia; as métricas seguem pela mesma conexão, serializadas.
+        """
+        # As filas por caixa da Communication não são usadas aqui: o anel as substitui
+        data = pickle.dumps(metrics_instance.snapshot(exclude=('lane_queue_',)))
+        with self.send_lock:
+            self.notify_conn.send_bytes(data)
+
+class RingQueue:
+    def __init__(self, ring, lanes):
+        """
+        Lê as mensagens do anel compartilhado com a mesma interface de queue.Queue usada pelo pipeline.
+
+        :param ring: O anel compartilhado.
+        :param lanes: O registro de caixas.
+        """
+        self.ring = ring
+        self.lanes = lanes
+
+    def empty(self):
+        return self.ring.empty()
+
+    def qsize(self):
+        return self.ring.pending()
+
+    def get(self):
+        """
+        Retorna a próxima mensagem do anel.
+
+        :return: Tupla (caixa, bytes da mensagem, tipos de evento, instante de enfileiramento).
+        """
+        record = self.ring.read()
+        index, tags, enqueued_at = RECORD_HEADER.unpack_from(record)
+        message = record[RECORD_HEADER.size:]
+        return (self.lanes.lanes[index].name, message, tags, enqueued_at)
+
+def run_ingest(ring_name, notify_conn, control_conn, lanes, settings, metrics_enabled):
+    """
+    Ponto de entrada do processo de recepção: executa a Communication gravando no anel compartilhado
+    até receber o pedido de encerramento.
+
+    :param ring_name: O nome do anel compartilhado.
+    :param notify_conn: A conexão usada para avisar o processo da interface e enviar as métricas.
+    :param control_conn: A conexão pela qual chega o pedido de encerramento.
+    :param lanes: O registro de caixas.
+    :param settings: Atributos da Communication a sobrescrever (LOCAL_PORT, IP_DVR...).
+    :param metrics_enabled: Coleta as métricas e as envia periodicamente ao processo da interface.
+    """
+    from network.communication import Communication
+    metrics_instance.enabled = metrics_enabled
+    ring = SharedRing.attach(ring_name)
+    writer = RingWriter(ring, lanes, notify_conn)
+    communication = Communication(lanes)
+    for attribute, value in settings.items():
+        setattr(communication, attribute, value)
+    communication.message_queue = writer
+    communication.on_messages = writer.notify
+    interval = config_instance.ingest_metrics_interval if metrics_enabled else None
+
+    def control():
+        # Um pedido de encerramento (ou o fim da conexão) encerra a recepção e o repasse, que
+        # termina de enviar o que estiver pendente; a captura é fechada entre registros
+        while not control_conn.poll(interval):
+            writer.send_metrics()
+        communication.close()
+        if metrics_enabled:
+            writer.send_metrics()
+
+    control_thread = threading.Thread(target=control, name="IngestControl", daemon=True)
+    control_thread.start()
+    communication.listen_and_update()
+    control_thread.join()
+    ring.close()
+
+class IngestProcess:
+    def __init__(self, lanes=None, ring_size=None, settings=None):
+        """
+        Executa a recepção e o repasse ao DVR em um processo separado, para que a latência
+        do repasse não dependa da carga da interface. Expõe a mesma interface da Communication
+        usada pelo pipeline (lanes, classifier, message_queue, on_messages, listen_and_update).
+
+        :param lanes: O registro de caixas; por padrão, o carregado de lanes.json.
+        :param ring_size: O tamanho do anel compartilhado, em bytes.
+        :param settings: Atributos da Communication a sobrescrever no processo de recepção.
+        """
+        self.lanes = lanes if lanes is not None else lane_registry
+        self.classifier = MessageClassifier(config_instance.event_keywords)
+        self.ring = SharedRing.create(ring_size or config_instance.ingest_ring_size, counters=len(self.lanes))
+        self.message_queue = RingQueue(self.ring, self.lanes)
+        for lane in self.lanes:
+            # O anel substitui a LaneQueue: publica os descartes com a mesma métrica por caixa
+            labels = f'lane="{lane.name}"'
+            metrics_instance.set_gauge('lane_queue_dropped', lambda ring=self.ring, index=lane.index: ring.counter(index), labels)
+        self.on_messages = None
+        self.settings = settings or {}
+        self.process = None
+        self.notify_conn = None
+        self.control_conn = None
+        atexit.register(self.close)
+
+    def start(self):
+        """
+        Inicia o processo de recepção.
+        """
+        if self.process is not None:
+            return
+        self.notify_conn, child_conn = multiprocessing.Pipe(duplex=False)
+        child_control, self.control_conn = multiprocessing.Pipe(duplex=False)
+        self.process = multiprocessing.Process(
+            target=run_ingest,
+            args=(self.ring.name, child_conn, child_control, self.lanes, self.settings, metrics_instance.enabled),
+            name="Ingest",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        child_control.close()
+
+    def listen_and_update(self):
+        """
+        Inicia o processo de recepção e repassa seus avisos de novas mensagens ao pipeline
+        e suas métricas ao registro deste processo. Executado em uma thread do processo da interface.
+        """
+        self.start()
+        while True:
+            try:
+                data = self.notify_conn.recv_bytes()
+            except (EOFError, OSError):
+                print("Processo de recepção encerrado")
+                return
+            if data:
+                metrics_instance.merge(pickle.loads(data))
+                continue
+            ring = self.ring
+            if ring is None:
+                return
+            # Limpa o indicador antes de acordar o consumidor, para que mensagens novas gerem outro aviso
+            ring.set(SharedRing.NOTIFY_PENDING, 0)
+            if self.on_messages is not None:
+                self.on_messages()
+
+    def close(self, timeout=5.0):
+        """
+        Pede ao processo de recepção que termine, enviando aos DVRs o que estiver pendente,
+        e remove o anel compartilhado. O processo só é terminado à força se não encerrar dentro
+        do tempo limite. Pode ser chamado mais de uma vez.
+
+        :param timeout: A espera máxima pelo encerramento do processo, em segundos.
+        """
+        if self.process is not None:
+            try:
+                self.control_conn.send_bytes(b'')
+            except OSError:
+                pass
+            self.process.join(timeout)
+            if self.process.is_alive():
+                print("O processo de recepção não terminou no tempo limite; encerrando à força")
+                self.process.terminate()
+                self.process.join()
+            self.control_conn.close()
+            self.process = None
+        if self.ring is not None:
+            for lane in self.lanes:
+                # Mantém exportado o total de descartes depois que o anel é removido
+                dropped = self.ring.counter(lane.index)
+                metrics_instance.set_gauge('lane_queue_dropped', lambda dropped=dropped: dropped, f'lane="{lane.name}"')
+            self.ring.close()
+            self.ring = None
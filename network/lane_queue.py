@@ -0,0 +1,141 @@
+import threading
+from collections import deque
+from queue import Empty
+from utils.metrics import metrics_instance
+
+class LaneQueue:
+    POLICIES = ('drop_oldest', 'coalesce', 'block')
+    ITEM_SEPARATOR = b'^'  # Separador dos itens de uma mensagem, usado ao juntar mensagens
+    MAX_COALESCED_BYTES = 64 * 1024  # Tamanho máximo de uma mensagem formada pela junção de outras
+
+    def __init__(self, lanes, max_messages, policy='coalesce', block_timeout=0.05, barrier_tags=0):
+        """
+        Fila de mensagens limitada por caixa, com a mesma interface de queue.Queue usada pelo pipeline.
+
+        Quando a fila de um caixa está cheia, a política de sobrecarga decide o que fazer:
+        'drop_oldest' descarta a mensagem mais antiga do caixa; 'coalesce' junta a nova mensagem
+        à última da fila, se nenhuma delas abrir uma transação; 'block' espera até block_timeout
+        segundos por espaço. Quando a junção ou a espera não resolvem, a mais antiga é descartada,
+        preservando as aberturas de transação, que delimitam os blocos do log e da exibição.
+        O repasse ao DVR é feito antes do enfileiramento e não é afetado.
+
+        A política 'block' faz o produtor esperar: serve apenas para produtores fora da thread de
+        rede (reprodução, testes); a Communication a recusa.
+
+        :param lanes: O registro de caixas.
+        :param max_messages: O máximo de mensagens pendentes por caixa.
+        :param policy: A política de sobrecarga.
+        :param block_timeout: A espera máxima por espaço, em segundos, na política 'block'.
+        :param barrier_tags: Os tipos de evento que impedem a junção (abertura de transação).
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Política de sobrecarga desconhecida: {policy}")
+        self.max_messages = max(1, max_messages)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.barrier_tags = barrier_tags
+        self.queues = {lane.name: deque() for lane in lanes}
+        self.order = list(self.queues)  # Os caixas são consumidos em rodízio
+        self.next_lane = 0
+        self.size = 0
+        self.high_water = dict.fromkeys(self.queues, 0)
+        self.dropped = dict.fromkeys(self.queues, 0)
+        self.coalesced = dict.fromkeys(self.queues, 0)
+        self.lock = threading.Lock()
+        self.not_full = threading.Condition(self.lock)
+        for lane in self.queues:
+            labels = f'lane="{lane}"'
+            metrics_instance.set_gauge('lane_queue_depth', lambda lane=lane: len(self.queues[lane]), labels)
+            metrics_instance.set_gauge('lane_queue_high_water', lambda lane=lane: self.high_water[lane], labels)
+            metrics_instance.set_gauge('lane_queue_dropped', lambda lane=lane: self.dropped[lane], labels)
+            metrics_instance.set_gauge('lane_queue_coalesced', lambda lane=lane: self.coalesced[lane], labels)
+
+    def put(self, item):
+        """
+        Enfileira uma mensagem, aplicando a política de sobrecarga se a fila do caixa estiver cheia.
+        Chamado pela thread de rede (ou pelo produtor da reprodução).
+
+        :param item: Tupla (caixa, bytes da mensagem, tipos de evento, instante de enfileiramento).
+        """
+        lane = item[0]
+        with self.lock:
+            pending = self.queues[lane]
+            if len(pending) >= self.max_messages:
+                if self.policy == 'coalesce' and self.coalesce(lane, pending, item):
+                    return
+                if self.policy == 'block':
+                    self.not_full.wait_for(lambda: len(pending) < self.max_messages, self.block_timeout)
+                if len(pending) >= self.max_messages:
+                    self.drop_oldest(pending)
+                    self.size -= 1
+                    self.dropped[lane] += 1
+            pending.append(item)
+            self.size += 1
+            if len(pending) > self.high_water[lane]:
+                self.high_water[lane] = len(pending)
+
+    def drop_oldest(self, pending):
+        """
+        Descarta a mensagem mais antiga do caixa que não abre transação; se todas abrirem, a mais antiga.
+
+        :param pending: A fila do caixa, não vazia.
+        """
+        for index, (_lane, _message, tags, _enqueued_at) in enumerate(pending):
+            if not tags & self.barrier_tags:
+                del pending[index]
+                return
+        pending.popleft()
+
+    def coalesce(self, lane, pending, item):
+        """
+        Junta os itens de uma mensagem à última mensagem pendente do caixa.
+
+        :param lane: O nome do caixa.
+        :param pending: A fila do caixa.
+        :param item: A nova mensagem.
+        :return: True se a mensagem foi juntada; False se uma delas abre transação ou o resultado seria grande demais.
+        """
+        _lane, last_message, last_tags, last_enqueued_at = pending[-1]
+        _lane, message, tags, _enqueued_at = item
+        if (last_tags | tags) & self.barrier_tags:
+            return False
+        if len(last_message) + len(message) + 1 > self.MAX_COALESCED_BYTES:
+            return False
+        # Mantém o instante da mensagem mais antiga, para que a latência medida inclua a espera
+        pending[-1] = (lane, last_message + self.ITEM_SEPARATOR + message, last_tags | tags, last_enqueued_at)
+        self.coalesced[lane] += 1
+        return True
+
+    def get(self):
+        """
+        Retira a próxima mensagem, alternando entre os caixas com mensagens pendentes.
+
+        :return: Tupla (caixa, bytes da mensagem, tipos de evento, instante de enfileiramento).
+        :raises Empty: Se não houver mensagens.
+        """
+        with self.lock:
+            for _ in range(len(self.order)):
+                pending = self.queues[self.order[self.next_lane]]
+                self.next_lane = (self.next_lane + 1) % len(self.order)
+                if pending:
+                    self.size -= 1
+                    if self.policy == 'block':
+                        self.not_full.notify()
+                    return pending.popleft()
+        raise Empty
+
+    def empty(self):
+        """
+        Indica se a fila está vazia.
+
+        :return: True se não houver mensagens pendentes.
+        """
+        return self.size == 0
+
+    def qsize(self):
+        """
+        Retorna o número total de mensagens pendentes, somando todos os caixas.
+
+        :return: O número de mensagens.
+        """
+        return self.size
@@ -0,0 +1,43 @@
+class ReceiveBuffer:
+    def __init__(self, size, max_datagram):
+        """
+        Área de recepção pré-alocada, reutilizada a cada lote: os datagramas são lidos com
+        recvfrom_into um após o outro na mesma área, sem criar um objeto bytes por leitura.
+
+        :param size: O espaço para os datagramas de um lote, em bytes.
+        :param max_datagram: O maior datagrama aceito, em bytes (até 64 KiB).
+        """
+        self.max_datagram = max_datagram
+        # Um byte a mais que o máximo permite distinguir um datagrama truncado de um que cabe exatamente
+        self.slot_size = max_datagram + 1
+        self.buffer = bytearray(size + self.slot_size)
+        self.view = memoryview(self.buffer)
+        self.offset = 0
+
+    def reset(self):
+        """
+        Libera a área para o próximo lote. As visões retornadas antes passam a ser sobrescritas.
+        """
+        self.offset = 0
+
+    def has_room(self):
+        """
+        Indica se ainda cabe um datagrama do tamanho máximo no lote atual.
+        """
+        return self.offset + self.slot_size <= len(self.buffer)
+
+    def receive(self, sock):
+        """
+        Lê um datagrama do socket para a próxima posição livre da área.
+
+        :param sock: O socket de escuta não bloqueante.
+        :return: Tupla (visão dos dados, endereço, truncado). A visão só é válida até o próximo reset.
+        :raises BlockingIOError: Se não houver datagrama pendente.
+        """
+        start = self.offset
+        nbytes, addr = sock.recvfrom_into(self.view[start:start + self.slot_size])
+        truncated = nbytes > self.max_datagram
+        if truncated:
+            nbytes = self.max_datagram
+        self.offset = start + nbytes
+        return self.view[start:start + nbytes], addr, truncated
@@ -0,0 +1,163 @@
+import struct
+from multiprocessing import shared_memory
+
+class SharedRing:
+    HEADER_SIZE = 64
+    WRITE_POS = 0  # Total de bytes publicados pelo produtor
+    READ_POS = 8  # Total de bytes consumidos pelo consumidor
+    WRITTEN = 16  # Registros publicados
+    READ = 24  # Registros consumidos
+    DROPPED = 32  # Registros descartados por falta de espaço
+    NOTIFY_PENDING = 40  # Indica que já há um aviso de novas mensagens a caminho do consumidor
+    COUNTERS = 48  # Número de contadores extras, gravados logo após o cabeçalho
+    LENGTH = struct.Struct('<I')
+    COUNTER = struct.Struct('<Q')
+    WRAP = 0xFFFFFFFF  # Marca de volta ao início da área de dados
+
+    def __init__(self, shm, owner):
+        """
+        Anel de bytes em memória compartilhada com um único produtor e um único consumidor.
+
+        Cada registro é gravado como tamanho (4 bytes) seguido dos dados. As posições são
+        contadores crescentes; o produtor só altera WRITE_POS e o consumidor só altera READ_POS.
+        Os contadores extras (por exemplo, descartes por caixa) são alterados apenas pelo produtor.
+
+        :param shm: O bloco de memória compartilhada.
+        :param owner: Indica se este processo criou o bloco (e deve removê-lo).
+        """
+        self.shm = shm
+        self.owner = owner
+        self.buf = shm.buf
+        self.counters = self.get(self.COUNTERS)
+        self.data_start = self.HEADER_SIZE + self.counters * self.COUNTER.size
+        self.capacity = shm.size - self.data_start
+
+    @classmethod
+    def create(cls, size, counters=0):
+        """
+        Cria um novo anel.
+
+        :param size: O tamanho total do bloco, em bytes.
+        :param counters: O número de contadores extras.
+        :return: O anel criado.
+        """
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        data_start = cls.HEADER_SIZE + counters * cls.COUNTER.size
+        shm.buf[:data_start] = bytes(data_start)
+        cls.COUNTER.pack_into(shm.buf, cls.COUNTERS, counters)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Conecta-se a um anel criado por outro processo.
+
+        :param name: O nome do bloco de memória compartilhada.
+        :return: O anel conectado.
+        """
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def get(self, offset):
+        return self.COUNTER.unpack_from(self.buf, offset)[0]
+
+    def set(self, offset, value):
+        self.COUNTER.pack_into(self.buf, offset, value)
+
+    def counter(self, index):
+        """
+        Lê um contador extra.
+
+        :param index: O índice do contador.
+        :return: O valor do contador ou 0 se o anel já foi fechado.
+        """
+        if self.buf is None:
+            return 0
+        return self.get(self.HEADER_SIZE + index * self.COUNTER.size)
+
+    def increment(self, index):
+        """
+        Incrementa um contador extra. Chamado apenas pelo produtor.
+
+        :param index: O índice do contador.
+        """
+        offset = self.HEADER_SIZE + index * self.COUNTER.size
+        self.set(offset, self.get(offset) + 1)
+
+    def write(self, payload):
+        """
+        Publica um registro. Chamado apenas pelo produtor.
+
+        :param payload: Os bytes do registro.
+        :return: True se o registro foi publicado; False se foi descartado por falta de espaço.
+        """
+        size = self.LENGTH.size + len(payload)
+        write_pos = self.get(self.WRITE_POS)
+        free = self.capacity - (write_pos - self.get(self.READ_POS))
+        offset = write_pos % self.capacity
+        tail_room = self.capacity - offset
+        needed = size if size <= tail_room else tail_room + size
+        if needed > free:
+            self.set(self.DROPPED, self.get(self.DROPPED) + 1)
+            return False
+        if size > tail_room:
+            if tail_room >= self.LENGTH.size:
+                self.LENGTH.pack_into(self.buf, self.data_start + offset, self.WRAP)
+            write_pos += tail_room
+            offset = 0
+        start = self.data_start + offset
+        self.LENGTH.pack_into(self.buf, start, len(payload))
+        self.buf[start + self.LENGTH.size:start + size] = payload
+        # Publica por último, para que o consumidor só veja registros completos
+        self.set(self.WRITE_POS, write_pos + size)
+        self.set(self.WRITTEN, self.get(self.WRITTEN) + 1)
+        return True
+
+    def read(self):
+        """
+        Consome o próximo registro. Chamado apenas pelo consumidor.
+
+        :return: Os bytes do registro ou None se o anel estiver vazio.
+        """
+        read_pos = self.get(self.READ_POS)
+        while read_pos != self.get(self.WRITE_POS):
+            offset = read_pos % self.capacity
+            tail_room = self.capacity - offset
+            if tail_room < self.LENGTH.size:
+                read_pos += tail_room
+                continue
+            start = self.data_start + offset
+            length = self.LENGTH.unpack_from(self.buf, start)[0]
+            if length == self.WRAP:
+                read_pos += tail_room
+                continue
+            payload = bytes(self.buf[start + self.LENGTH.size:start + self.LENGTH.size + length])
+            self.set(self.READ, self.get(self.READ) + 1)
+            self.set(self.READ_POS, read_pos + self.LENGTH.size + length)
+            return payload
+        self.set(self.READ_POS, read_pos)
+        return None
+
+    def empty(self):
+        """
+        Indica se não há registros pendentes.
+        """
+        return self.get(self.WRITTEN) == self.get(self.READ)
+
+    def pending(self):
+        """
+        Retorna o número de registros publicados e ainda não consumidos.
+        """
+        return self.get(self.WRITTEN) - self.get(self.READ)
+
+    def close(self):
+        """
+        Desconecta o anel e, se este processo o criou, remove o bloco de memória.
+        """
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
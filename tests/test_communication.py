@@ -0,0 +1,85 @@
+import socket
+import threading
+import unittest
+from common.lanes import Lane, LaneRegistry
+from network.communication import WSAEMSGSIZE, Communication
+from utils.metrics import metrics_instance
+
+class FakeSocket:
+    def __init__(self, results):
+        """
+        Socket com a interface de recvfrom_into, que devolve ou levanta os resultados em ordem.
+
+        :param results: Lista de tuplas (bytes, endereço) ou exceções.
+        """
+        self.results = list(results)
+
+    def recvfrom_into(self, buffer):
+        if not self.results:
+            raise BlockingIOError()
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        data, addr = result
+        buffer[:len(data)] = data
+        return len(data), addr
+
+class ReceiveBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.communication = Communication(LaneRegistry([Lane(0, 'pdv1', '127.0.0.1', 41000, 41500, 'screen1_log.txt')]))
+        self.receive_buffer = self.communication.create_receive_buffer()
+        self.metrics_enabled = metrics_instance.enabled
+        metrics_instance.enabled = True
+
+    def tearDown(self):
+        metrics_instance.enabled = self.metrics_enabled
+
+    def test_oversized_datagram_on_windows_is_counted_and_skipped(self):
+        before = metrics_instance.counters.get(('datagrams_truncated', 'desconhecido'), 0)
+        sock = FakeSocket([
+            (b"PDV 001 Trans 000001", ('127.0.0.1', 41000)),
+            OSError(WSAEMSGSIZE, "A message sent on a datagram socket was larger than the buffer"),
+            (b"7891000100103 ARROZ", ('127.0.0.1', 41000)),
+        ])
+        batch = self.communication.receive_batch(sock, self.receive_buffer)
+        self.assertEqual([bytes(data) for data, _addr, _truncated in batch], [b"PDV 001 Trans 000001", b"7891000100103 ARROZ"])
+        self.assertEqual(metrics_instance.counters[('datagrams_truncated', 'desconhecido')], before + 1)
+
+    def test_other_errors_are_raised(self):
+        sock = FakeSocket([OSError(9, "Bad file descriptor")])
+        with self.assertRaises(OSError):
+            self.communication.receive_batch(sock, self.receive_buffer)
+
+class CloseTest(unittest.TestCase):
+    def setUp(self):
+        self.sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sink.bind(('127.0.0.1', 0))
+        self.sink.settimeout(1.0)
+        lane = Lane(0, 'pdv1', '127.0.0.1', 41000, 0, 'screen1_log.txt', [self.sink.getsockname()])
+        self.communication = Communication(LaneRegistry([lane]))
+        self.communication.LOCAL_IP = '127.0.0.1'
+
+    def tearDown(self):
+        self.communication.close()
+        self.sink.close()
+
+    def test_queued_forwards_are_sent_on_close(self):
+        self.communication.forward_worker = self.communication.create_forward_worker()
+        self.communication.forward_worker.start()
+        for index in range(5):
+            # Sem wakeup: as mensagens ficam na fila de repasse até o encerramento
+            self.communication.forward_worker.put('pdv1', f"ITEM {index}".encode(), 0.0)
+        self.communication.close()
+        received = [self.sink.recvfrom(1024)[0] for _ in range(5)]
+        self.assertEqual(received, [f"ITEM {index}".encode() for index in range(5)])
+
+    def test_close_stops_listening(self):
+        self.communication.LOCAL_PORT = 0
+        thread = threading.Thread(target=self.communication.listen_and_update, daemon=True)
+        thread.start()
+        self.communication.close()
+        thread.join(2.0)
+        self.assertFalse(thread.is_alive())
+
+if __name__ == "__main__":
+    unittest.main()
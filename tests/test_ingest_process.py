@@ -0,0 +1,22 @@
+import threading
+import unittest
+from common.lanes import Lane, LaneRegistry
+from network.ingest_process import IngestProcess
+
+class CloseTest(unittest.TestCase):
+    def test_close_stops_the_process_cleanly(self):
+        lanes = LaneRegistry([Lane(0, 'pdv1', '127.0.0.1', 41000, 0, 'screen1_log.txt', [('127.0.0.1', 9)])])
+        ingest = IngestProcess(lanes, 64 * 1024, {'LOCAL_IP': '127.0.0.1', 'LOCAL_PORT': 0})
+        thread = threading.Thread(target=ingest.listen_and_update, daemon=True)
+        thread.start()
+        while ingest.process is None:
+            thread.join(0.01)
+        process = ingest.process
+        ingest.close()
+        # Código 0: o processo encerrou sozinho, sem terminate
+        self.assertEqual(process.exitcode, 0)
+        thread.join(2.0)
+        self.assertFalse(thread.is_alive())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from common.lanes import Lane, LaneRegistry
+from network.lane_queue import LaneQueue
+
+TRANSACTION = 1
+
+class BarrierEvictionTest(unittest.TestCase):
+    def setUp(self):
+        self.lanes = LaneRegistry([Lane(0, 'pdv1', '127.0.0.1', 41000, 41500, 'screen1_log.txt')])
+
+    def messages(self, queue):
+        items = []
+        while not queue.empty():
+            items.append(queue.get()[1])
+        return items
+
+    def test_drop_oldest_keeps_transaction_opening(self):
+        queue = LaneQueue(self.lanes, 3, 'drop_oldest', barrier_tags=TRANSACTION)
+        queue.put(('pdv1', b"PDV 001 Trans 000001", TRANSACTION, 0.0))
+        for index in range(3):
+            queue.put(('pdv1', f"ITEM {index}".encode(), 0, 0.0))
+        self.assertEqual(self.messages(queue), [b"PDV 001 Trans 000001", b"ITEM 1", b"ITEM 2"])
+        self.assertEqual(queue.dropped['pdv1'], 1)
+
+    def test_failed_coalesce_keeps_transaction_opening(self):
+        queue = LaneQueue(self.lanes, 2, 'coalesce', barrier_tags=TRANSACTION)
+        queue.put(('pdv1', b"PDV 001 Trans 000001", TRANSACTION, 0.0))
+        queue.put(('pdv1', b"ITEM 0", 0, 0.0))
+        # A nova abertura não pode ser juntada; o item é descartado, e não a abertura anterior
+        queue.put(('pdv1', b"PDV 001 Trans 000002", TRANSACTION, 0.0))
+        self.assertEqual(self.messages(queue), [b"PDV 001 Trans 000001", b"PDV 001 Trans 000002"])
+
+    def test_only_openings_drops_the_oldest(self):
+        queue = LaneQueue(self.lanes, 2, 'drop_oldest', barrier_tags=TRANSACTION)
+        for index in range(3):
+            queue.put(('pdv1', f"PDV 001 Trans {index:06d}".encode(), TRANSACTION, 0.0))
+        self.assertEqual(self.messages(queue), [b"PDV 001 Trans 000001", b"PDV 001 Trans 000002"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import time
+import unittest
+from queue import Queue
+from common.config import config_instance
+from common.lanes import Lane, LaneRegistry
+from common.pipeline import Pipeline
+from ui.renderer import NullRenderer
+from utils.classifier import MessageClassifier
+from utils.event_loop import EventLoop
+
+class FakeSource:
+    def __init__(self, lanes):
+        """
+        Fonte de mensagens com a interface da Communication usada pelo pipeline.
+
+        :param lanes: O registro de caixas.
+        """
+        self.lanes = lanes
+        self.classifier = MessageClassifier(config_instance.event_keywords)
+        self.message_queue = Queue()
+        self.on_messages = None
+
+    def put(self, lane, text):
+        data = text.encode()
+        self.message_queue.put((lane, data, self.classifier.classify(data), time.perf_counter()))
+
+class TextRenderer(NullRenderer):
+    def __init__(self):
+        """
+        Renderizador que guarda o último texto desenhado de cada caixa.
+        """
+        self.texts = {}
+
+    def render_lane(self, lane, text):
+        self.texts[lane] = text
+
+class DuplicateMessageTest(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp(prefix="pipeline_test_")
+        self.log_file = os.path.join(self.log_dir, "screen1_log.txt")
+        self.source = FakeSource(LaneRegistry([Lane(0, 'pdv1', '127.0.0.1', 41000, 41500, self.log_file)]))
+        self.renderer = TextRenderer()
+        self.pipeline = Pipeline(self.source, self.renderer, EventLoop())
+        self.pipeline.log_writer.start()
+
+    def tearDown(self):
+        self.pipeline.close()
+
+    def test_repeated_item_is_stored_and_logged(self):
+        self.assertGreater(config_instance.duplicate_window, 0)
+        self.source.put('pdv1', "PDV 001 Trans 000001 Atend OPERADOR")
+        self.source.put('pdv1', "7891000100103 ARROZ TIPO 1 5KG")
+        self.source.put('pdv1', "7891000100103 ARROZ TIPO 1 5KG")
+        self.pipeline.process_queue()
+
+        lines = list(self.pipeline.line_store.line_buffers['pdv1'])
+        self.assertEqual(lines.count("7891000100103 ARROZ TIPO 1 5KG"), 2)
+
+        # A abertura da próxima transação grava a anterior no log
+        self.source.put('pdv1', "PDV 001 Trans 000002 Atend OPERADOR")
+        self.pipeline.process_queue()
+        self.pipeline.close()
+        with open(self.log_file, encoding='utf-8') as file:
+            self.assertEqual(file.read().count("7891000100103 ARROZ TIPO 1 5KG"), 2)
+
+    def test_repeated_message_is_rendered(self):
+        self.source.put('pdv1', "7891000100103 ARROZ TIPO 1 5KG")
+        self.pipeline.process_queue()
+        self.pipeline.render_frame()
+        self.source.put('pdv1', "7891000100103 ARROZ TIPO 1 5KG")
+        self.pipeline.process_queue()
+        self.pipeline.render_frame()
+        self.assertEqual(self.renderer.texts['pdv1'].count("7891000100103 ARROZ TIPO 1 5KG"), 2)
+
+if __name__ == "__main__":
+    unittest.main()
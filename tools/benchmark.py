@@ -0,0 +1,339 @@
+"""
+Gerador de carga em loopback e medição de vazão/latência do relay.
+
+Simula N PDVs enviando cupons por UDP para a Communication, com um DVR local que recebe
+os repasses, e executa o pipeline sem tela. Uso, a partir da raiz do projeto:
+
+    python -m tools.benchmark --lanes 16 --rate 200 --duration 10
+"""
+import argparse
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from common.lanes import Lane, LaneRegistry
+from common.pipeline import Pipeline
+from network.communication import Communication
+from network.ingest_process import IngestProcess
+from ui.renderer import NullRenderer
+from utils.event_loop import EventLoop
+from utils.metrics import metrics_instance
+
+PRODUTOS = [
+    ("7891000100103", "ARROZ TIPO 1 5KG", 22.90),
+    ("7896005800010", "FEIJAO CARIOCA 1KG", 8.49),
+    ("7891910000197", "ACUCAR REFINADO 1KG", 4.99),
+    ("7894900011517", "REFRIGERANTE COLA 2L", 9.79),
+    ("7891149103102", "CAFE TORRADO 500G", 17.45),
+    ("7891000053508", "LEITE INTEGRAL 1L", 5.29),
+]
+
+class TrafficGenerator:
+    def __init__(self, lanes, target=None, seed=None, deliver=None, record=True):
+        """
+        Inicializa o gerador de tráfego com um socket por PDV simulado.
+
+        :param lanes: O registro de caixas simulados.
+        :param target: O endereço (ip, porta) de escuta da Communication.
+        :param seed: Semente do gerador aleatório, para cargas reproduzíveis.
+        :param deliver: Função chamada com (caixa, bytes) no lugar do envio por UDP; sem sockets.
+        :param record: Guarda o instante de envio de cada mensagem em sent_at.
+        """
+        self.lanes = lanes
+        self.target = target
+        self.random = random.Random(seed)
+        self.deliver = deliver
+        self.record = record
+        self.sockets = {}
+        self.sent_at = {}
+        self.sequence = 0
+        self.items_left = {}
+        for lane in lanes:
+            if deliver is None:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                sock.bind(lane.addr)
+                self.sockets[lane.name] = sock
+            self.items_left[lane.name] = 0
+
+    def next_message(self, lane):
+        """
+        Gera a próxima mensagem de um PDV: abertura de transação, item do cupom ou relatório.
+
+        :param lane: O caixa simulado.
+        :return: O texto da mensagem, sem o número de sequência.
+        """
+        if self.items_left[lane.name] <= 0:
+            self.items_left[lane.name] = self.random.randint(5, 60)
+            if self.random.random() < 0.05:
+                return "Relatorio Gerencial^LEITURA X^TOTAL DO DIA"
+            return f"PDV {lane.index + 1:03d} Trans {self.random.randint(1, 999999):06d} Atend OPERADOR"
+        self.items_left[lane.name] -= 1
+        codigo, descricao, preco = self.random.choice(PRODUTOS)
+        quantidade = self.random.randint(1, 5)
+        return f"{codigo} {descricao}^{quantidade} UN x {preco:.2f}^{quantidade * preco:.2f}".replace('.', ',')
+
+    def send(self, lane):
+        """
+        Envia uma mensagem do PDV, marcada com um número de sequência no final.
+
+        :param lane: O caixa simulado.
+        """
+        self.sequence += 1
+        data = f"{self.next_message(lane)} #{self.sequence}".encode()
+        if self.record:
+            self.sent_at[self.sequence] = time.perf_counter()
+        if self.deliver is not None:
+            self.deliver(lane, data)
+        else:
+            self.sockets[lane.name].sendto(data, self.target)
+
+    def run(self, rate, duration, tick=0.005, pause=0.0, stop_event=None):
+        """
+        Envia rate mensagens por segundo em cada caixa durante duration segundos.
+
+        :param rate: Mensagens por segundo por caixa.
+        :param duration: Duração do envio em segundos.
+        :param tick: Intervalo de cada rajada de envio.
+        :param pause: Pausa máxima do caixa ao fim de cada cupom, em segundos (0 desativa).
+        :param stop_event: Evento que interrompe o envio.
+        """
+        lanes = list(self.lanes)
+        start = time.perf_counter()
+        idle_until = dict.fromkeys(self.items_left, 0.0)
+        due = 0.0
+        slot = 0
+        while stop_event is None or not stop_event.is_set():
+            elapsed = time.perf_counter() - start
+            if elapsed >= duration:
+                break
+            due = elapsed * rate * len(lanes)
+            while slot < due:
+                lane = lanes[slot % len(lanes)]
+                slot += 1
+                if idle_until[lane.name] > elapsed:
+                    continue
+                self.send(lane)
+                if pause and self.items_left[lane.name] == 0:
+                    # Fim do cupom: o caixa fica parado até o próximo cliente
+                    idle_until[lane.name] = elapsed + self.random.uniform(0, pause)
+            time.sleep(tick)
+
+    def close(self):
+        """
+        Fecha os sockets dos PDVs simulados.
+        """
+        for sock in self.sockets.values():
+            sock.close()
+
+class DvrSink:
+    def __init__(self, addr):
+        """
+        Inicializa o DVR local que registra o instante de chegada de cada repasse.
+
+        :param addr: O endereço (ip, porta) de escuta do DVR.
+        """
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+        self.sock.bind(addr)
+        self.sock.settimeout(0.2)
+        self.received_at = {}
+        self.running = True
+
+    def run(self):
+        """
+        Recebe os repasses até que stop seja chamado.
+        """
+        while self.running:
+            try:
+                data, _addr = self.sock.recvfrom(65535)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.received_at[sequence_of(data.decode('utf-8', errors='replace'))] = time.perf_counter()
+        self.sock.close()
+
+    def stop(self):
+        """
+        Encerra a recepção; o socket é fechado pela thread de recepção.
+        """
+        self.running = False
+
+class RecordingRenderer(NullRenderer):
+    def __init__(self):
+        """
+        Inicializa o renderizador que registra o instante em que cada mensagem chega à exibição.
+        """
+        self.pending = {}
+        self.rendered_at = {}
+
+    def show_message(self, lane, message, tags):
+        self.pending.setdefault(lane, []).append(sequence_of(message))
+
+    def render_lane(self, lane, text):
+        now = time.perf_counter()
+        for sequence in self.pending.pop(lane, ()):
+            self.rendered_at[sequence] = now
+
+def sequence_of(message):
+    """
+    Extrai o número de sequência acrescentado pelo gerador ao final da mensagem.
+
+    :param message: O texto da mensagem.
+    :return: O número de sequência ou None.
+    """
+    _text, _sep, sequence = message.rpartition(" #")
+    return int(sequence) if sequence.isdigit() else None
+
+def percentile(sorted_values, fraction):
+    """
+    Retorna o percentil de uma lista já ordenada.
+
+    :param sorted_values: Os valores ordenados.
+    :param fraction: A fração desejada (0.5, 0.99...).
+    :return: O valor do percentil ou None se a lista estiver vazia.
+    """
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+def latency_report(name, sent_at, arrived_at):
+    """
+    Monta o resumo de latências de um estágio.
+
+    :param name: O nome do estágio.
+    :param sent_at: Instante de envio por número de sequência.
+    :param arrived_at: Instante de chegada por número de sequência.
+    :return: Tupla (linha do relatório, p99 em milissegundos).
+    """
+    latencies = sorted((arrived_at[seq] - sent) * 1000 for seq, sent in sent_at.items() if seq in arrived_at)
+    lost = len(sent_at) - len(latencies)
+    p50, p99, p999 = (percentile(latencies, f) for f in (0.5, 0.99, 0.999))
+    if p50 is None:
+        return f"{name}: nenhuma mensagem recebida ({lost} perdidas)", None
+    return f"{name}: {len(latencies)} recebidas, {lost} perdidas, p50 {p50:.3f} ms, p99 {p99:.3f} ms, p999 {p999:.3f} ms", p99
+
+def build_lanes(count, base_port, log_dir):
+    """
+    Cria o registro de caixas simulados em loopback.
+
+    :param count: O número de caixas.
+    :param base_port: A primeira porta usada pelos PDVs simulados.
+    :param log_dir: O diretório dos logs de transação.
+    :return: O registro de caixas.
+    """
+    return LaneRegistry(
+        Lane(index, f"pdv{index + 1}", '127.0.0.1', base_port + index, base_port + 1000 + index, f"{log_dir}/screen{index + 1}_log.txt")
+        for index in range(count)
+    )
+
+def run_benchmark(lanes=4, rate=100, duration=5.0, port=39800, dvr_port=39801, base_port=40000, seed=None, ingest_process=False):
+    """
+    Executa a carga e retorna os resultados.
+
+    :param lanes: Número de PDVs simulados.
+    :param rate: Mensagens por segundo por PDV.
+    :param duration: Duração do envio em segundos.
+    :param port: Porta de escuta da Communication.
+    :param dvr_port: Porta do DVR local.
+    :param base_port: Primeira porta dos PDVs simulados.
+    :param seed: Semente do gerador de tráfego.
+    :param ingest_process: Executa a recepção em um processo separado, ligado por memória compartilhada.
+    :return: Dicionário com as linhas do relatório e os indicadores medidos.
+    """
+    log_dir = tempfile.mkdtemp(prefix="benchmark_logs_")
+    registry = build_lanes(lanes, base_port, log_dir)
+    settings = {'LOCAL_IP': '127.0.0.1', 'LOCAL_PORT': port, 'IP_DVR': '127.0.0.1', 'PORTA_ENV_DVR': dvr_port}
+    if ingest_process:
+        communication = IngestProcess(registry, settings=settings)
+    else:
+        communication = Communication(registry)
+        for attribute, value in settings.items():
+            setattr(communication, attribute, value)
+
+    renderer = RecordingRenderer()
+    loop = EventLoop()
+    pipeline = Pipeline(communication, renderer, loop)
+    pipeline.start()
+    dvr = DvrSink(('127.0.0.1', dvr_port))
+    threading.Thread(target=dvr.run, daemon=True).start()
+    threading.Thread(target=communication.listen_and_update, daemon=True).start()
+    loop_thread = threading.Thread(target=loop.run, daemon=True)
+    loop_thread.start()
+    time.sleep(0.2)
+
+    generator = TrafficGenerator(registry, (settings['LOCAL_IP'], port), seed)
+    start = time.perf_counter()
+    generator.run(rate, duration)
+    send_elapsed = time.perf_counter() - start
+    time.sleep(1.0)  # Tempo para drenar o que ainda estiver em trânsito
+
+    loop.stop()
+    loop_thread.join()
+    communication.close()
+    dvr.stop()
+    pipeline.close()
+    generator.close()
+
+    sent = len(generator.sent_at)
+    forward_line, forward_p99 = latency_report("envio → repasse ao DVR", generator.sent_at, dvr.received_at)
+    render_line, render_p99 = latency_report("envio → exibição", generator.sent_at, renderer.rendered_at)
+    return {
+        'lines': [
+            f"{lanes} PDVs, {rate} msg/s por PDV, {duration:.1f} s (logs em {log_dir})",
+            f"enviadas: {sent} ({sent / send_elapsed:.0f} datagramas/s)",
+            forward_line,
+            render_line,
+        ],
+        'throughput': sent / send_elapsed,
+        'forward_drops': sent - len(dvr.received_at),
+        'render_drops': sent - len(renderer.rendered_at),
+        'forward_p99': forward_p99,
+        'render_p99': render_p99,
+    }
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando. Retorna código diferente de zero se algum limite for violado.
+
+    :param argv: A lista de argumentos; por padrão, sys.argv.
+    :return: O código de saída.
+    """
+    parser = argparse.ArgumentParser(description="Carga em loopback e medição de vazão/latência do relay.")
+    parser.add_argument('--lanes', type=int, default=4, help="número de PDVs simulados")
+    parser.add_argument('--rate', type=float, default=100, help="mensagens por segundo por PDV")
+    parser.add_argument('--duration', type=float, default=5.0, help="duração do envio em segundos")
+    parser.add_argument('--port', type=int, default=39800, help="porta de escuta da Communication")
+    parser.add_argument('--dvr-port', type=int, default=39801, help="porta do DVR local")
+    parser.add_argument('--base-port', type=int, default=40000, help="primeira porta dos PDVs simulados")
+    parser.add_argument('--seed', type=int, help="semente do gerador de tráfego")
+    parser.add_argument('--ingest-process', action='store_true', help="executa a recepção em um processo separado")
+    parser.add_argument('--metrics', action='store_true', help="coleta e exibe as métricas por estágio do pipeline")
+    parser.add_argument('--max-drops', type=int, help="falha se houver mais perdas que isso no repasse ou na exibição")
+    parser.add_argument('--max-forward-p99', type=float, help="falha se o p99 do repasse ao DVR passar disso (ms)")
+    parser.add_argument('--max-render-p99', type=float, help="falha se o p99 até a exibição passar disso (ms)")
+    args = parser.parse_args(argv)
+
+    metrics_instance.enabled = args.metrics
+    result = run_benchmark(args.lanes, args.rate, args.duration, args.port, args.dvr_port, args.base_port, args.seed, args.ingest_process)
+    for line in result['lines']:
+        print(line)
+    if args.metrics:
+        print(metrics_instance.render(), end="")
+
+    failures = []
+    if args.max_drops is not None and max(result['forward_drops'], result['render_drops']) > args.max_drops:
+        failures.append(f"perdas acima de {args.max_drops}")
+    if args.max_forward_p99 is not None and (result['forward_p99'] is None or result['forward_p99'] > args.max_forward_p99):
+        failures.append(f"p99 do repasse acima de {args.max_forward_p99} ms")
+    if args.max_render_p99 is not None and (result['render_p99'] is None or result['render_p99'] > args.max_render_p99):
+        failures.append(f"p99 da exibição acima de {args.max_render_p99} ms")
+    for failure in failures:
+        print(f"FALHA: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
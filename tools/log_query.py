@@ -0,0 +1,70 @@
+"""
+Busca de transações nos logs dos caixas pelo índice gravado junto a cada log (<log>.idx).
+
+A busca por intervalo de tempo é binária no índice, e apenas os blocos candidatos são lidos
+do log, inclusive nos arquivos rotacionados e compactados. Uso, a partir da raiz do projeto:
+
+    python -m tools.log_query --lane pdv2 --start "2026-10-18 14:00" --end "2026-10-18 15:00"
+    python -m tools.log_query --transaction 229750
+    python -m tools.log_query --keyword "CAFE TORRADO" --operator OPERADOR
+    python -m tools.log_query --rebuild screen1_log.2026-01-31_23-59-59.txt.gz
+"""
+import argparse
+import sys
+from datetime import datetime
+from common.lanes import lane_registry
+from utils.log_index import find_blocks, parse_time, rebuild_index
+
+def format_time(timestamp):
+    """
+    Formata um instante para exibição.
+
+    :param timestamp: O instante em time.time().
+    :return: A data/hora no formato AAAA-MM-DD HH:MM:SS.
+    """
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando.
+
+    :param argv: A lista de argumentos; por padrão, sys.argv.
+    :return: O código de saída (1 se nada for encontrado).
+    """
+    parser = argparse.ArgumentParser(description="Busca de transações nos logs dos caixas pelo índice.")
+    parser.add_argument('--lane', action='append', help="caixa a consultar (ex.: pdv2); pode ser repetido; padrão: todos")
+    parser.add_argument('--start', help="data/hora inicial, ex.: '2026-10-18 14:00'")
+    parser.add_argument('--end', help="data/hora final")
+    parser.add_argument('--keyword', help="texto que deve constar na transação")
+    parser.add_argument('--pdv', help="número do PDV da abertura da transação")
+    parser.add_argument('--transaction', help="número da transação")
+    parser.add_argument('--operator', help="operador que atendeu")
+    parser.add_argument('--list', action='store_true', help="lista apenas os cabeçalhos, sem o texto das transações")
+    parser.add_argument('--rebuild', nargs='+', metavar='LOG', help="gera o índice de logs gravados antes da indexação")
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        for log_path in args.rebuild:
+            print(f"{log_path}: {rebuild_index(log_path)} blocos indexados")
+        return 0
+
+    lanes = [lane_registry.get(name) for name in args.lane] if args.lane else list(lane_registry)
+    if None in lanes:
+        parser.error(f"caixa desconhecido; disponíveis: {', '.join(lane.name for lane in lane_registry)}")
+    start, end = parse_time(args.start), parse_time(args.end)
+    found = 0
+    for lane in lanes:
+        blocks = find_blocks(lane.log_file, start, end, args.keyword,
+                             pdv=args.pdv, transaction=args.transaction, operator=args.operator)
+        for log_path, entry, text in blocks:
+            found += 1
+            ids = " ".join(f"{field}={value}" for field, value in
+                           (('pdv', entry.pdv), ('trans', entry.transaction), ('operador', entry.operator)) if value)
+            print(f"== [{lane.name}] {format_time(entry.started)} → {format_time(entry.saved)} {ids} ({log_path}@{entry.offset})")
+            if not args.list:
+                print(text, end="" if text.endswith("\n") else "\n")
+    print(f"{found} transações encontradas", file=sys.stderr)
+    return 0 if found else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
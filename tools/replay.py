@@ -0,0 +1,218 @@
+"""
+Reprodução de capturas binárias dos datagramas recebidos (config.capture_file).
+
+Lê a captura mapeada em memória e reinjeta as mensagens no pipeline na velocidade original,
+acelerada ou o mais rápido possível, sem repassar ao DVR. Os logs de transação da reprodução
+são gravados em um diretório separado. Uso, a partir da raiz do projeto:
+
+    python -m tools.replay captura.bin --speed 10
+    python -m tools.replay captura.bin --speed 0 --metrics
+    python -m tools.replay captura.bin --dump --lane pdv2 --start "2026-10-18 14:00"
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from queue import Queue
+from common.config import config_instance
+from common.lanes import Lane, LaneRegistry, lane_registry
+from common.pipeline import Pipeline
+from network.capture import CaptureReader
+from utils.classifier import MessageClassifier
+from utils.log_index import parse_time
+from utils.metrics import metrics_instance
+
+class CaptureSource:
+    def __init__(self, lanes):
+        """
+        Fonte de mensagens do pipeline alimentada por uma captura, com a mesma interface da
+        Communication usada pelo pipeline (lanes, classifier, message_queue, on_messages).
+
+        :param lanes: O registro de caixas.
+        """
+        self.lanes = lanes
+        self.classifier = MessageClassifier(config_instance.event_keywords)
+        self.message_queue = Queue()
+        self.on_messages = None
+        self.replayed = 0
+
+    def resolve_lane(self, lane_index, addr):
+        """
+        Identifica o caixa de um registro pelo índice gravado ou, se ausente, pelo endereço de origem.
+
+        :param lane_index: O índice do caixa gravado na captura ou None.
+        :param addr: O endereço (ip, porta) de origem.
+        :return: O caixa ou None se a origem for desconhecida.
+        """
+        if lane_index is not None and lane_index < len(self.lanes):
+            return self.lanes.lanes[lane_index]
+        return self.lanes.lookup(addr)
+
+    def replay(self, records, speed, lane_name=None, batch_size=256):
+        """
+        Enfileira os registros respeitando os intervalos originais divididos por speed.
+
+        :param records: Os registros da captura, como retornados por CaptureReader.records.
+        :param speed: Fator de aceleração; 0 reproduz o mais rápido possível.
+        :param lane_name: Reproduz apenas este caixa, se informado.
+        :param batch_size: Mensagens por despertar do pipeline no modo mais rápido possível.
+        """
+        first_timestamp = None
+        start = time.perf_counter()
+        pending = 0
+        for timestamp, addr, lane_index, data in records:
+            lane = self.resolve_lane(lane_index, addr)
+            if lane is None or (lane_name is not None and lane.name != lane_name):
+                continue
+            if first_timestamp is None:
+                first_timestamp = timestamp
+            if speed > 0:
+                delay = start + (timestamp - first_timestamp) / speed - time.perf_counter()
+                if delay > 0:
+                    self.notify()
+                    pending = 0
+                    time.sleep(delay)
+            self.message_queue.put((lane.name, data, self.classifier.classify(data), time.perf_counter()))
+            self.replayed += 1
+            pending += 1
+            if pending >= batch_size:
+                self.notify()
+                pending = 0
+        self.notify()
+
+    def notify(self):
+        """
+        Acorda o pipeline para consumir as mensagens enfileiradas.
+        """
+        if self.on_messages is not None and not self.message_queue.empty():
+            self.on_messages()
+
+def relocate_logs(lanes, log_dir):
+    """
+    Cria uma cópia do registro de caixas com os logs de transação em outro diretório,
+    para que a reprodução não altere os logs de produção.
+
+    :param lanes: O registro de caixas.
+    :param log_dir: O diretório dos logs da reprodução.
+    :return: O novo registro de caixas.
+    """
+    return LaneRegistry(
+        Lane(lane.index, lane.name, lane.remote_ip, lane.remote_port, lane.local_port,
+             os.path.join(log_dir, os.path.basename(lane.log_file)))
+        for lane in lanes
+    )
+
+def dump(reader, lanes, start, end, lane_name, output):
+    """
+    Exibe os registros da captura como texto, com o instante original de recepção.
+
+    :param reader: O leitor da captura.
+    :param lanes: O registro de caixas.
+    :param start: O instante inicial ou None.
+    :param end: O instante final ou None.
+    :param lane_name: Exibe apenas este caixa, se informado.
+    :param output: O arquivo de saída.
+    """
+    for timestamp, addr, lane_index, data in reader.records(start, end):
+        lane = lanes.lanes[lane_index] if lane_index is not None and lane_index < len(lanes) else None
+        name = lane.name if lane is not None else "?"
+        if lane_name is not None and name != lane_name:
+            continue
+        text = data.decode('utf-8', errors='replace').replace('^', ' | ')
+        stamp = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        output.write(f"{stamp} {addr[0]}:{addr[1]} [{name}] {text}\n")
+
+def replay(reader, lanes, speed, start, end, lane_name, gui, output, log_dir):
+    """
+    Reinjeta a captura no pipeline e aguarda o consumo de todas as mensagens.
+
+    :param reader: O leitor da captura.
+    :param lanes: O registro de caixas.
+    :param speed: Fator de aceleração; 0 reproduz o mais rápido possível.
+    :param start: O instante inicial ou None.
+    :param end: O instante final ou None.
+    :param lane_name: Reproduz apenas este caixa, se informado.
+    :param gui: Exibe a reprodução nas janelas dos caixas.
+    :param output: Sem tela, o arquivo em que as mensagens são exibidas ou None.
+    :param log_dir: O diretório dos logs de transação da reprodução.
+    :return: Tupla (mensagens reproduzidas, segundos decorridos).
+    """
+    source = CaptureSource(relocate_logs(lanes, log_dir))
+    if gui:
+        from ui.interface import Interface
+        from ui.tk_loop import TkLoop
+        renderer = Interface.get_instance()
+        loop = TkLoop(renderer.main_window)
+    else:
+        from ui.renderer import NullRenderer, StreamRenderer
+        from utils.event_loop import EventLoop
+        renderer = StreamRenderer(output) if output is not None else NullRenderer()
+        loop = EventLoop()
+    pipeline = Pipeline(source, renderer, loop)
+    pipeline.start()
+    result = {}
+
+    def feed():
+        pipeline.dispatching.wait()
+        started_at = time.perf_counter()
+        source.replay(reader.records(start, end), speed, lane_name)
+        while not source.message_queue.empty():
+            time.sleep(0.01)
+        result['elapsed'] = time.perf_counter() - started_at
+        if not gui:
+            loop.call_from_thread(loop.stop)
+
+    threading.Thread(target=feed, daemon=True).start()
+    loop.run()
+    pipeline.close()
+    return source.replayed, result.get('elapsed', 0.0)
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando.
+
+    :param argv: A lista de argumentos; por padrão, sys.argv.
+    :return: O código de saída.
+    """
+    parser = argparse.ArgumentParser(description="Reprodução de capturas binárias dos datagramas recebidos.")
+    parser.add_argument('capture', help="arquivo de captura (config.capture_file)")
+    parser.add_argument('--speed', type=float, default=1.0, help="fator de aceleração; 0 reproduz o mais rápido possível")
+    parser.add_argument('--start', help="data/hora inicial, ex.: '2026-10-18 14:00'")
+    parser.add_argument('--end', help="data/hora final")
+    parser.add_argument('--lane', help="reproduz apenas este caixa (ex.: pdv2)")
+    parser.add_argument('--dump', action='store_true', help="apenas lista os registros como texto, com o instante original")
+    parser.add_argument('--gui', action='store_true', help="exibe a reprodução nas janelas dos caixas")
+    parser.add_argument('--output', help="sem tela, '-' para exibir as mensagens no terminal ou o caminho de um arquivo")
+    parser.add_argument('--log-dir', help="diretório dos logs de transação da reprodução (padrão: temporário)")
+    parser.add_argument('--metrics', action='store_true', help="coleta e exibe as métricas por estágio do pipeline")
+    args = parser.parse_args(argv)
+
+    reader = CaptureReader(args.capture)
+    start, end = parse_time(args.start), parse_time(args.end)
+    output = None
+    try:
+        if args.dump:
+            dump(reader, lane_registry, start, end, args.lane, sys.stdout)
+            return 0
+        metrics_instance.enabled = args.metrics
+        log_dir = args.log_dir or tempfile.mkdtemp(prefix="replay_logs_")
+        if args.output == '-':
+            output = sys.stdout
+        elif args.output is not None:
+            output = open(args.output, 'a', encoding='utf-8')
+        replayed, elapsed = replay(reader, lane_registry, args.speed, start, end, args.lane, args.gui, output, log_dir)
+    finally:
+        reader.close()
+        if output is not None and output is not sys.stdout:
+            output.close()
+    rate = replayed / elapsed if elapsed else 0.0
+    print(f"{replayed} mensagens reproduzidas em {elapsed:.2f} s ({rate:.0f} msg/s; logs em {log_dir})")
+    if args.metrics:
+        print(metrics_instance.render(), end="")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
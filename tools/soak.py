@@ -0,0 +1,222 @@
+"""
+Teste de longa duração (soak) em tempo acelerado.
+
+Simula um turno inteiro de PDVs (transações, itens, relatórios e pausas que disparam o alerta
+de inatividade) direto no pipeline, com o tempo acelerado por --speed, e amostra periodicamente
+o RSS, a memória rastreada pelo tracemalloc, os agendamentos pendentes, a fila e o texto dos
+canvas. Falha se algum desses valores continuar crescendo na parte final do turno. Uso, a partir
+da raiz do projeto:
+
+    python -m tools.soak --hours 24 --speed 1200
+    python -m tools.soak --hours 8 --speed 600 --gui --report soak_memory.txt
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from common.config import config_instance
+from common.lanes import lane_registry
+from common.pipeline import Pipeline
+from network.lane_queue import LaneQueue
+from tools.benchmark import TrafficGenerator
+from tools.replay import relocate_logs
+from utils.classifier import MessageClassifier
+from utils.memory_probe import memory_probe
+
+class ShiftSource:
+    def __init__(self, lanes, seed=None):
+        """
+        Fonte de mensagens do pipeline que simula o turno dos PDVs com o gerador de tráfego do
+        benchmark, com a mesma interface da Communication usada pelo pipeline (lanes, classifier,
+        message_queue, on_messages).
+
+        :param lanes: O registro de caixas.
+        :param seed: Semente do gerador aleatório, para turnos reproduzíveis.
+        """
+        self.lanes = lanes
+        self.classifier = MessageClassifier(config_instance.event_keywords)
+        self.message_queue = LaneQueue(
+            lanes,
+            config_instance.queue_max_messages,
+            config_instance.queue_overload_policy,
+            config_instance.queue_block_timeout,
+            self.classifier.flag('transaction'),
+        )
+        self.on_messages = None
+        # Sem sent_at: num turno longo o registro dos envios cresceria sem limite
+        self.generator = TrafficGenerator(lanes, seed=seed, deliver=self.deliver, record=False)
+
+    @property
+    def sent(self):
+        return self.generator.sequence
+
+    def deliver(self, lane, data):
+        """
+        Coloca uma mensagem gerada na fila do caixa, como a Communication faria ao recebê-la.
+
+        :param lane: O caixa simulado.
+        :param data: Os bytes da mensagem.
+        """
+        self.message_queue.put((lane.name, data, self.classifier.classify(data), time.perf_counter()))
+        if self.on_messages is not None:
+            self.on_messages()
+
+    def run(self, seconds, speed, rate, pause, stop_event):
+        """
+        Envia as mensagens de todos os caixas durante o turno simulado.
+
+        :param seconds: A duração do turno simulado, em segundos.
+        :param speed: O fator de aceleração do tempo.
+        :param rate: Mensagens por segundo simulado em cada caixa.
+        :param pause: A pausa máxima entre cupons, em segundos simulados.
+        :param stop_event: Evento que interrompe a simulação.
+        """
+        self.generator.run(rate * speed, seconds / speed, pause=pause / speed, stop_event=stop_event)
+
+def growth(values, warmup=0.25):
+    """
+    Compara o pico do início da série com a mediana do final, ignorando o aquecimento. Valores
+    limitados que oscilam com o tráfego (linhas dos cupons abertos, fila) ficam abaixo do pico
+    inicial; um vazamento desloca a série inteira e a mediana final passa dele.
+
+    :param values: Os valores amostrados, em ordem.
+    :param warmup: A fração inicial ignorada.
+    :return: Tupla (pico inicial, mediana final) ou None se houver poucas amostras.
+    """
+    values = [value for value in values[int(len(values) * warmup):] if value is not None]
+    if len(values) < 4:
+        return None
+    middle = len(values) // 2
+    return max(values[:middle]), statistics.median(values[middle:])
+
+def format_value(name, value):
+    """
+    Formata um valor amostrado para a tabela.
+
+    :param name: O nome da medida.
+    :param value: O valor.
+    :return: O texto formatado.
+    """
+    if value is None:
+        return "-"
+    if name in ('rss', 'traced'):
+        return f"{value / (1024 * 1024):.1f}M"
+    return str(value)
+
+def soak(hours, speed, sample_minutes, gui, seed, log_dir, rate=0.5, pause=90):
+    """
+    Executa o turno simulado e coleta as amostras.
+
+    :param hours: A duração do turno simulado, em horas.
+    :param speed: O fator de aceleração do tempo.
+    :param sample_minutes: O intervalo simulado entre as amostras, em minutos.
+    :param gui: Exibe o turno nas janelas dos caixas.
+    :param seed: Semente do gerador aleatório.
+    :param log_dir: O diretório dos logs de transação do teste.
+    :param rate: Mensagens por segundo simulado em cada caixa.
+    :param pause: A pausa máxima entre cupons, em segundos simulados.
+    :return: Tupla (amostras, mensagens enviadas).
+    """
+    # Os prazos do pipeline são encurtados na mesma proporção do tempo simulado
+    config_instance.tempoatencao /= speed
+    config_instance.duplicate_window /= speed
+    memory_probe.start()
+    source = ShiftSource(relocate_logs(lane_registry, log_dir), seed)
+    if gui:
+        from ui.interface import Interface
+        from ui.tk_loop import TkLoop
+        renderer = Interface.get_instance()
+        renderer.blink_clock.interval = max(1, int(renderer.blink_clock.interval / speed))
+        loop = TkLoop(renderer.main_window)
+    else:
+        from ui.renderer import NullRenderer
+        from utils.event_loop import EventLoop
+        renderer = NullRenderer()
+        loop = EventLoop()
+    pipeline = Pipeline(source, renderer, loop)
+    pipeline.start()
+    samples = []
+    sample_ms = max(1, int(sample_minutes * 60 * 1000 / speed))
+
+    def sample():
+        values = memory_probe.sample()
+        values['sent'] = source.sent
+        samples.append(values)
+        loop.after(sample_ms, sample)
+
+    stop_event = threading.Event()
+
+    def feed():
+        pipeline.dispatching.wait()
+        source.run(hours * 3600, speed, rate, pause, stop_event)
+        while not source.message_queue.empty():
+            time.sleep(0.01)
+        loop.call_from_thread(sample)
+        loop.call_from_thread(loop.stop)
+
+    loop.after(sample_ms, sample)
+    threading.Thread(target=feed, daemon=True).start()
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        stop_event.set()
+    pipeline.close()
+    return samples, source.sent
+
+def main(argv=None):
+    """
+    Ponto de entrada de linha de comando. Retorna código diferente de zero se algum valor crescer.
+
+    :param argv: A lista de argumentos; por padrão, sys.argv.
+    :return: O código de saída.
+    """
+    parser = argparse.ArgumentParser(description="Teste de longa duração do pipeline em tempo acelerado.")
+    parser.add_argument('--hours', type=float, default=24, help="duração do turno simulado, em horas")
+    parser.add_argument('--speed', type=float, default=1200, help="fator de aceleração do tempo")
+    parser.add_argument('--rate', type=float, default=0.5, help="mensagens por segundo simulado em cada caixa")
+    parser.add_argument('--pause', type=float, default=90, help="pausa máxima entre cupons, em segundos simulados")
+    parser.add_argument('--sample-minutes', type=float, default=30, help="intervalo simulado entre as amostras, em minutos")
+    parser.add_argument('--gui', action='store_true', help="exibe o turno nas janelas dos caixas")
+    parser.add_argument('--seed', type=int, help="semente do gerador de tráfego")
+    parser.add_argument('--log-dir', help="diretório dos logs de transação do teste (padrão: temporário)")
+    parser.add_argument('--max-growth', type=float, default=0.10, help="crescimento relativo tolerado entre o início e o final do turno")
+    parser.add_argument('--report', help="grava ao final o relatório das maiores alocações neste arquivo")
+    args = parser.parse_args(argv)
+
+    log_dir = args.log_dir or tempfile.mkdtemp(prefix="soak_logs_")
+    started_at = time.perf_counter()
+    samples, sent = soak(args.hours, args.speed, args.sample_minutes, args.gui, args.seed, log_dir, args.rate, args.pause)
+    elapsed = time.perf_counter() - started_at
+    print(f"{sent} mensagens em {args.hours:g} h simuladas ({elapsed:.1f} s reais; logs em {log_dir})")
+    if not samples:
+        print("Nenhuma amostra coletada", file=sys.stderr)
+        return 1
+
+    names = [name for name in samples[0] if name != 'sent']
+    print(" ".join(f"{name:>20}" for name in ['sent'] + names))
+    for values in samples:
+        print(" ".join(f"{format_value(name, values.get(name)):>20}" for name in ['sent'] + names))
+
+    # Folga absoluta para o ruído de valores pequenos: 1 MiB para memória, 2 para contagens
+    failures = []
+    for name in names:
+        result = growth([values.get(name) for values in samples])
+        if result is None:
+            continue
+        early, late = result
+        slack = 1024 * 1024 if name in ('rss', 'traced') else 2
+        if late > early * (1 + args.max_growth) + slack:
+            failures.append(f"{name} cresceu de {format_value(name, early)} para {format_value(name, late)}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as file:
+            file.write(memory_probe.report())
+        print(f"Relatório de memória gravado em {args.report}")
+    for failure in failures:
+        print(f"FALHA: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+class AnimationClock:
+    def __init__(self, widget, interval, apply):
+        """
+        Relógio único das animações de alerta: um só after alterna, de uma vez, a fase de
+        todos os itens animados, independentemente de quantos sejam.
+
+        Incluir ou retirar um item apenas muda o conjunto de itens; sem itens, o relógio para.
+
+        :param widget: O widget Tk usado para agendar o relógio.
+        :param interval: O intervalo entre as alternâncias, em milissegundos.
+        :param apply: Função chamada com (item, fase ligada) para exibir a fase de um item.
+        """
+        self.widget = widget
+        self.interval = interval
+        self.apply = apply
+        self.items = set()
+        self.phase = False
+        self.after_id = None
+
+    def add(self, item):
+        """
+        Inclui um item na animação, já na fase atual dos demais.
+
+        :param item: O item a ser animado.
+        """
+        if item in self.items:
+            return
+        if not self.items:
+            self.phase = True  # O primeiro item começa na fase de alerta
+        self.items.add(item)
+        self.apply(item, self.phase)
+        if self.after_id is None:
+            self.after_id = self.widget.after(self.interval, self.tick)
+
+    def discard(self, item):
+        """
+        Retira um item da animação e o devolve à fase desligada.
+
+        :param item: O item animado.
+        """
+        if item not in self.items:
+            return
+        self.items.discard(item)
+        self.apply(item, False)
+        if not self.items and self.after_id is not None:
+            self.widget.after_cancel(self.after_id)
+            self.after_id = None
+
+    def __contains__(self, item):
+        return item in self.items
+
+    def tick(self):
+        """
+        Alterna a fase de todos os itens animados e agenda a próxima alternância.
+        """
+        self.after_id = None
+        if not self.items:
+            return
+        self.phase = not self.phase
+        for item in self.items:
+            self.apply(item, self.phase)
+        self.after_id = self.widget.after(self.interval, self.tick)
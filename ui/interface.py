@@ -1,11 +1,16 @@
 import tkinter as tk
 from screeninfo import get_monitors
 from common.config import config_instance
+from common.lanes import lane_registry
+from ui.animation import AnimationClock
+from ui.layout import WindowLayout
+from ui.line_view import LineView
+from utils.memory_probe import memory_probe
+from ui.renderer import Renderer
+from ui.window_manager import WindowManager
 from utils.helpers import CanvasHelper
-from network.communication import communication_instance
-import time
 
-class Interface:
+class Interface(Renderer):
     _instance = None
 
     def __init__(self):
@@ -17,17 +22,24 @@ class Interface:
         else:
             Interface._instance = self
 
+        self.lanes = lane_registry
         self.monitors = get_monitors()
         self.setup_monitors()
+        self.setup_layout()
         self.setup_windows()
         self.setup_canvas()
         self.setup_text()
         self.setup_bindings()
         self.intervalo_piscar = 1000
-        self.painted_width = self.monitor_width // 5
-        self.painted_height = self.monitor_height // 2
-        self.canvas_helper = CanvasHelper(self.text_id_map, self.file_map)
-        self.process_queue()
+        self.canvas_helper = CanvasHelper(self.text_id_map)
+        # Um único relógio faz piscar, em sincronia, todos os caixas em alerta
+        self.blink_clock = AnimationClock(self.main_window, self.intervalo_piscar, self.aplicar_piscar)
+        self.rendered_chars = {}  # Tamanho do texto exibido em cada canvas sem linhas virtuais
+        memory_probe.add_counter('canvas_text_chars', self.canvas_text_size)
+        memory_probe.add_counter('canvas_text_items', lambda: sum(len(view.items) for view in self.line_views.values()) + len(self.rendered_chars))
+        memory_probe.add_counter('blinking_lanes', lambda: len(self.blink_clock.items))
+        if config_instance.monitor_check_interval:
+            self.main_window.after(config_instance.monitor_check_interval * 1000, self.check_monitors)
 
     @staticmethod
     def get_instance():
@@ -78,45 +90,66 @@ class Interface:
         self.centro_x = self.canto_inferior_direito_x - (self.monitor_width // 2)
         self.centro_y = self.canto_inferior_direito_y - (self.monitor_height // 2)
 
-    def setup_windows(self):
+    def setup_layout(self):
+        """
+        Calcula uma única vez a grade de janelas do monitor usado: os caixas são empilhados
+        em colunas de lane_rows janelas. O layout só é recalculado se os monitores mudarem.
         """
-        Configura as janelas principais da interface.
+        monitor = (self.monitor_offset_x, self.monitor_offset_y, self.monitor_width, self.monitor_height)
+        self.layout = WindowLayout(monitor, len(self.lanes), config_instance.lane_rows)
+        self.grid_rows = self.layout.grid_rows
+        self.grid_columns = self.layout.grid_columns
+        self.column_spacing = self.layout.column_spacing
+        self.painted_width = self.layout.painted_width
+        self.painted_height = self.layout.painted_height
+
+    def lane_position(self, index):
         """
-        self.root1 = tk.Tk()
-        self.root2 = tk.Tk()
-        self.root3 = tk.Tk()
-        self.root4 = tk.Tk()
+        Retorna a posição original da janela de um caixa.
 
-        self.configure_window(self.root1, self.monitor_offset_x, 0, self.monitor_width // 5, self.monitor_height // 2)
-        self.configure_window(self.root2, self.monitor_offset_x, self.monitor_height // 2, self.monitor_width // 5, self.monitor_height // 2)
-        right_half_x = self.monitor_offset_x + (self.monitor_width // 2)
-        self.configure_window(self.root3, right_half_x, 0, self.monitor_width // 5, self.monitor_height // 2)
-        self.configure_window(self.root4, right_half_x, self.monitor_height // 2, self.monitor_width // 5, self.monitor_height // 2)
+        :param index: A posição do caixa no registro.
+        :return: Tupla (x, y) do canto superior esquerdo da janela.
+        """
+        return self.layout.lane_position(index)
 
-    def configure_window(self, root, x, y, width, height):
+    def check_monitors(self):
         """
-        Configura uma janela específica com as dimensões e posição fornecidas.
+        Verifica periodicamente se os monitores mudaram e, nesse caso, recalcula o layout
+        e reaplica a geometria atual de cada janela.
+        """
+        monitors = get_monitors()
+        if [(m.x, m.y, m.width, m.height) for m in monitors] != [(m.x, m.y, m.width, m.height) for m in self.monitors]:
+            print("Mudança de monitores detectada; recalculando o layout das janelas")
+            self.monitors = monitors
+            self.setup_monitors()
+            self.setup_layout()
+            for lane in self.lanes:
+                self.set_lane_mode(lane.name, self.window_modes[lane.name], force=True)
+        self.main_window.after(config_instance.monitor_check_interval * 1000, self.check_monitors)
 
-        :param root: A janela a ser configurada.
-        :param x: Posição X da janela.
-        :param y: Posição Y da janela.
-        :param width: Largura da janela.
-        :param height: Altura da janela.
+    def setup_windows(self):
         """
-        print(f"x: {x} y: {y} width: {width} height: {height}")
-        root.attributes('-topmost', True)
-        root.attributes('-alpha', 0.9)
-        root.overrideredirect(True)
-        root.geometry(f"{width}x{height}+{x}+{y}")
+        Cria uma janela (Toplevel) para cada caixa do registro, todas no mesmo interpretador Tk.
+        A raiz oculta do gerenciador de janelas é a janela principal, que executa o loop de eventos.
+        """
+        self.window_manager = WindowManager()
+        for lane in self.lanes:
+            x, y = self.lane_position(lane.index)
+            self.window_manager.create_window(lane.name, x, y, self.painted_width, self.painted_height)
+        self.windows = self.window_manager.windows
+        self.main_window = self.window_manager.root
+        self.window_modes = {lane.name: 'restored' for lane in self.lanes}  # 'restored', 'zoomed' ou 'hidden'
 
     def setup_canvas(self):
         """
         Configura os canvas para cada janela.
         """
-        self.canvas1 = self.create_canvas(self.root1, self.monitor_width // 5, self.monitor_height // 2)
-        self.canvas2 = self.create_canvas(self.root2, self.monitor_width // 5, self.monitor_height // 2)
-        self.canvas3 = self.create_canvas(self.root3, self.monitor_width // 5, self.monitor_height // 2)
-        self.canvas4 = self.create_canvas(self.root4, self.monitor_width // 5, self.monitor_height // 2)
+        self.canvases = {}
+        self.window_canvases = {}
+        for lane in self.lanes:
+            window = self.windows[lane.name]
+            self.canvases[lane.name] = self.create_canvas(window, self.painted_width, self.painted_height)
+            self.window_canvases[window] = self.canvases[lane.name]
 
     def create_canvas(self, root, width, height):
         """
@@ -129,38 +162,26 @@ class Interface:
         """
         canvas = tk.Canvas(root, width=width, height=height, bg='black')
         canvas.pack(fill=tk.BOTH, expand=True)
-        canvas.bind("<Configure>", lambda e: self.on_canvas_configure(canvas))
+        canvas.bind("<Configure>", lambda e: self.on_canvas_configure(canvas, e.width, e.height))
         return canvas
 
     def setup_text(self):
         """
-        Configura os textos iniciais para cada canvas.
-        """
-        self.text_id1 = self.create_text(self.canvas1, self.monitor_width // 5, self.monitor_height // 2)
-        self.text_id2 = self.create_text(self.canvas2, self.monitor_width // 5, self.monitor_height // 2)
-        self.text_id3 = self.create_text(self.canvas3, self.monitor_width // 5, self.monitor_height // 2)
-        self.text_id4 = self.create_text(self.canvas4, self.monitor_width // 5, self.monitor_height // 2)
-
-        self.text_id_map = {
-            self.canvas1: self.text_id1,
-            self.canvas2: self.text_id2,
-            self.canvas3: self.text_id3,
-            self.canvas4: self.text_id4
-        }
-
-        self.file_map = {
-            self.canvas1: "screen1_log.txt",
-            self.canvas2: "screen2_log.txt",
-            self.canvas3: "screen3_log.txt",
-            self.canvas4: "screen4_log.txt"
-        }
-
-        self.last_message_time = {
-            self.canvas1: None,
-            self.canvas2: None,
-            self.canvas3: None,
-            self.canvas4: None
-        }
+        Configura os textos iniciais para cada canvas: uma exibição por linhas (LineView) ou,
+        com config.virtual_lines desligado, um único item de texto.
+        """
+        self.text_id_map = {}
+        self.line_views = {}
+        self.last_message_time = {}
+        for lane in self.lanes:
+            canvas = self.canvases[lane.name]
+            if config_instance.virtual_lines:
+                self.line_views[canvas] = LineView(canvas, self.painted_width, self.painted_height)
+                self.line_views[canvas].render("********************")
+                self.text_id_map[canvas] = LineView.TAG
+            else:
+                self.text_id_map[canvas] = self.create_text(canvas, self.painted_width, self.painted_height)
+            self.last_message_time[canvas] = None
 
     def create_text(self, canvas, width, height):
         """
@@ -177,8 +198,9 @@ class Interface:
         """
         Configura os eventos de fechamento para as janelas.
         """
-        for root in [self.root1, self.root2, self.root3, self.root4]:
+        for root in self.windows.values():
             self.bind_close_event(root)
+        config_instance.open_windows.append(self.main_window)
 
     def bind_close_event(self, root):
         """
@@ -186,52 +208,38 @@ class Interface:
 
         :param root: A janela onde o evento será vinculado.
         """
-        root.bind('<Escape>', lambda e: config_instance.close_window(self.root1, self.root2, self.root3, self.root4))
+        root.bind('<Escape>', lambda e: config_instance.close_window(*config_instance.open_windows))
 
-    def on_canvas_configure(self, canvas):
+    def on_canvas_configure(self, canvas, width, height):
         """
-        Atualiza a área de rolagem do canvas quando ele é redimensionado.
+        Atualiza a exibição do canvas quando ele é redimensionado.
 
         :param canvas: O canvas a ser atualizado.
+        :param width: A nova largura do canvas.
+        :param height: A nova altura do canvas.
         """
+        if canvas in self.line_views:
+            self.line_views[canvas].resize(width, height)
+            return
         canvas.update_idletasks()
         canvas.configure(scrollregion=canvas.bbox("all"))
         canvas.yview_moveto(1.0)
 
-    def parar_piscar_janela(self, canvas, cor_original):
+    def aplicar_piscar(self, canvas, alerta, cor_original='black', cor_alerta='yellow'):
         """
-        Para o efeito de piscar da janela e restaura a cor original.
-
-        :param canvas: O canvas a ser atualizado.
-        :param cor_original: A cor original do canvas.
-        """
-        canvas.configure(bg=cor_original)
-        canvas.itemconfig(self.text_id_map[canvas], fill="white")
-
-    def piscar_janela(self, canvas, cor_original, cor_alerta, root, mensagem_exibida):
-        """
-        Alterna a cor do canvas para criar um efeito de piscar.
+        Exibe uma fase do efeito de piscar de um canvas.
 
         :param canvas: O canvas a ser atualizado.
+        :param alerta: True para a cor de alerta, False para a cor original.
         :param cor_original: A cor original do canvas.
         :param cor_alerta: A cor de alerta do canvas.
-        :param root: A janela raiz.
-        :param mensagem_exibida: Indica se a mensagem de alerta está sendo exibida.
         """
-        def alternar_cor():
-            if not mensagem_exibida:  # Verifica se a mensagem de tempo sem eventos excedido está sendo exibida
-                return
-
-            if canvas['bg'] == cor_original:
-                canvas.configure(bg=cor_alerta)
-                canvas.itemconfig(self.text_id_map[canvas], fill="black")
-            else:
-                canvas.configure(bg=cor_original)
-                canvas.itemconfig(self.text_id_map[canvas], fill="white")
-            
-            root.after(self.intervalo_piscar, alternar_cor)
-
-        alternar_cor()
+        if alerta:
+            canvas.configure(bg=cor_alerta)
+            canvas.itemconfig(self.text_id_map[canvas], fill="black")
+        else:
+            canvas.configure(bg=cor_original)
+            canvas.itemconfig(self.text_id_map[canvas], fill="white")
 
     def move_and_resize_window(self, window, position, width, monitor_height, is_original_size):
         """
@@ -240,99 +248,89 @@ class Interface:
         :param window: A janela a ser movida e redimensionada.
         :param position: A posição da janela.
         :param width: A largura da janela.
-        :param monitor_height: A altura do monitor.
+        :param monitor_height: A altura da janela.
         :param is_original_size: Indica se a janela deve ser redimensionada para o tamanho original.
         """
         if not is_original_size:
-            width += 230  # Adiciona 230 pixels ao width
-            font_size = 16
+            font_size = WindowLayout.ZOOMED_FONT_SIZE
             text_width = width * 2
         else:
-            font_size = 8
+            font_size = WindowLayout.ORIGINAL_FONT_SIZE
             text_width = width
-        
+
         window.geometry(f"{width}x{monitor_height}+{position[0]}+{position[1]}")
 
-        # Atualiza o tamanho da fonte e o texto
-        for canvas, text_id in self.text_id_map.items():
-            canvas.itemconfig(text_id, font=("Helvetica", font_size), width=text_width, anchor=tk.CENTER)
-            canvas.coords(text_id, width // 2, monitor_height // 2)
+        # Atualiza o tamanho da fonte e o texto apenas do canvas desta janela
+        canvas = self.window_canvases[window]
+        if canvas in self.line_views:
+            self.line_views[canvas].set_geometry(width, monitor_height, font_size, text_width)
+            return
+        text_id = self.text_id_map[canvas]
+        canvas.itemconfig(text_id, font=("Helvetica", font_size), width=text_width, anchor=tk.CENTER)
+        canvas.coords(text_id, width // 2, monitor_height // 2)
+
+    def set_lane_mode(self, lane, mode, force=False):
+        """
+        Exibe a janela de um caixa na geometria original, ampliada ou a oculta, usando o layout
+        calculado. A geometria é aplicada uma única vez, apenas quando o modo muda.
+
+        :param lane: O nome do caixa.
+        :param mode: 'restored', 'zoomed' ou 'hidden'.
+        :param force: Reaplica a geometria mesmo sem mudança de modo (após mudar o layout).
+        """
+        current = self.window_modes[lane]
+        if mode == current and not force:
+            return
+        window = self.windows[lane]
+        if mode == 'hidden':
+            window.withdraw()
+        else:
+            if current == 'hidden':
+                window.deiconify()
+            geometry = self.layout.zoomed if mode == 'zoomed' else self.layout.restored[self.lanes.get(lane).index]
+            self.move_and_resize_window(window, *geometry)
+        self.window_modes[lane] = mode
 
-    def verificar_evento(self, canvas, root, ultima_atualizacao_evento, mensagem_exibida, verificar_evento_id):
+    def render_lane(self, lane, text):
         """
-        Verifica se houve um evento recente e atualiza a janela de acordo.
+        Redesenha o canvas de um caixa com o texto visível.
 
-        :param canvas: O canvas a ser atualizado.
-        :param root: A janela raiz.
-        :param ultima_atualizacao_evento: O timestamp da última atualização do evento.
-        :param mensagem_exibida: Indica se a mensagem de alerta está sendo exibida.
-        :param verificar_evento_id: O ID do evento de verificação.
-        """
-        if time.time() - ultima_atualizacao_evento > config_instance.tempoatencao and not mensagem_exibida:
-            root.after(0, lambda: self.piscar_janela(canvas, 'black', 'yellow', root, mensagem_exibida))
-            mensagem_exibida = True
+        :param lane: O nome do caixa.
+        :param text: O texto visível do caixa.
+        """
+        canvas = self.canvases[lane]
+        if canvas in self.line_views:
+            self.line_views[canvas].render(text)
         else:
-            verificar_evento_id = root.after(100, lambda: self.verificar_evento(canvas, root, ultima_atualizacao_evento, mensagem_exibida, verificar_evento_id))
+            self.canvas_helper.render(canvas, text)
+            self.rendered_chars[canvas] = len(text)
 
-    def parar_processamento_anterior(self, root, verificar_evento_id):
+    def canvas_text_size(self):
         """
-        Para o processamento anterior de eventos.
+        Retorna o total de caracteres exibidos nos canvas, sem consultar o Tk.
 
-        :param root: A janela raiz.
-        :param verificar_evento_id: O ID do evento de verificação.
+        :return: O número de caracteres.
         """
-        if verificar_evento_id:
-            root.after_cancel(verificar_evento_id)
+        total = sum(self.rendered_chars.values())
+        for view in self.line_views.values():
+            total += sum(len(text) for text in view.texts if text)
+        return total
 
-    def process_message(self, window, message, canvas, root, ultima_atualizacao_evento, mensagem_exibida, verificar_evento_id, monitorar, last_message):
+    def start_alert(self, lane):
         """
-        Processa uma mensagem recebida e atualiza o canvas correspondente.
+        Inicia o efeito de piscar na janela de um caixa sem eventos recentes.
 
-        :param window: A janela onde a mensagem será exibida.
-        :param message: A mensagem a ser processada.
-        :param canvas: O canvas a ser atualizado.
-        :param root: A janela raiz.
-        :param ultima_atualizacao_evento: O timestamp da última atualização do evento.
-        :param mensagem_exibida: Indica se a mensagem de alerta está sendo exibida.
-        :param verificar_evento_id: O ID do evento de verificação.
-        :param monitorar: Indica se a janela deve ser monitorada.
-        :param last_message: A última mensagem processada.
-        """
-        ultima_atualizacao_evento = time.time()
-        if last_message != message:
-            last_message = message
-            self.parar_processamento_anterior(root, verificar_evento_id)
-        self.canvas_helper.update_text(canvas, self.text_id_map[canvas], message)    
-
-        if mensagem_exibida:
-            self.parar_piscar_janela(canvas, 'black')
-            mensagem_exibida = False
-
-        if any(keyword in message for keyword in ["PDV", "Atend", "Trans"]):
-            monitorar = True
-
-        if not any(keyword in message for keyword in ["Relatorio", "Gerencial"]) and monitorar:
-            verificar_evento_id = root.after(0, lambda: self.verificar_evento(canvas, root, ultima_atualizacao_evento, mensagem_exibida, verificar_evento_id))
-        else:
-            monitorar = False
-
-    def process_queue(self):
-        """
-        Processa a fila de mensagens e atualiza as janelas correspondentes.
-        """
-        while not communication_instance.message_queue.empty():
-            window, message = communication_instance.message_queue.get()
-            
-            if window == 'root1':
-                self.process_message(window, message, self.canvas1, self.root1, None, None, None, None, None)
-            elif window == 'root2':
-                self.process_message(window, message, self.canvas2, self.root2, None, None, None, None, None)
-            elif window == 'root3':
-                self.process_message(window, message, self.canvas3, self.root3, None, None, None, None, None)
-            elif window == 'root4':
-                self.process_message(window, message, self.canvas4, self.root4, None, None, None, None, None)
-                    
-        self.root1.after(100, self.process_queue)
+        :param lane: O nome do caixa.
+        """
+        self.blink_clock.add(self.canvases[lane])
+
+    def stop_alert(self, lane):
+        """
+        Para o efeito de piscar na janela de um caixa.
+
+        :param lane: O nome do caixa.
+        """
+        self.blink_clock.discard(self.canvases[lane])
 
 if __name__ == "__main__":
     Interface()
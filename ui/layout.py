@@ -0,0 +1,53 @@
+class WindowLayout:
+    ZOOM_EXTRA_WIDTH = 230  # Largura acrescentada à janela ampliada
+    ORIGINAL_FONT_SIZE = 8
+    ZOOMED_FONT_SIZE = 16
+
+    def __init__(self, monitor, lane_count, lane_rows):
+        """
+        Calcula uma única vez a grade de janelas de um monitor: a posição e o tamanho de cada
+        caixa na grade e da janela ampliada. Os valores não mudam depois de criados; uma mudança
+        de monitor gera um novo layout.
+
+        :param monitor: Tupla (x, y, largura, altura) do monitor usado.
+        :param lane_count: O número de caixas.
+        :param lane_rows: O número de janelas empilhadas em cada coluna.
+        """
+        self.monitor = monitor
+        self.offset_x, self.offset_y, self.monitor_width, self.monitor_height = monitor
+        self.lane_count = lane_count
+        self.grid_rows = max(1, min(lane_rows, lane_count))
+        self.grid_columns = -(-lane_count // self.grid_rows)
+        self.column_spacing = self.monitor_width // self.grid_columns
+        self.painted_width = min(self.monitor_width // 5, self.column_spacing)
+        self.painted_height = self.monitor_height // self.grid_rows
+        # Geometria de cada caixa: (posição, largura, altura, tamanho original)
+        self.restored = [
+            (self.lane_position(index), self.painted_width, self.painted_height, True)
+            for index in range(lane_count)
+        ]
+        self.zoomed = (self.lane_position(0), self.painted_width + self.ZOOM_EXTRA_WIDTH, self.monitor_height, False)
+
+    def lane_position(self, index):
+        """
+        Retorna a posição original da janela de um caixa.
+
+        :param index: A posição do caixa no registro.
+        :return: Tupla (x, y) do canto superior esquerdo da janela.
+        """
+        column, row = divmod(index, self.grid_rows)
+        return (self.offset_x + column * self.column_spacing, row * self.painted_height)
+
+    def hit_test(self, x, y):
+        """
+        Determina a célula da grade sob uma posição da tela. Posições fora do monitor
+        contam para a célula mais próxima.
+
+        :param x: Posição X na tela.
+        :param y: Posição Y na tela.
+        :return: A posição do caixa correspondente ou None se a célula estiver vazia.
+        """
+        column = min(max(int((x - self.offset_x) * self.grid_columns // self.monitor_width), 0), self.grid_columns - 1)
+        row = min(max(int((y - self.offset_y) * self.grid_rows // self.monitor_height), 0), self.grid_rows - 1)
+        index = column * self.grid_rows + row  # As janelas são empilhadas de cima para baixo em cada coluna
+        return index if index < self.lane_count else None
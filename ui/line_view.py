@@ -0,0 +1,156 @@
+import textwrap
+import tkinter.font as tkfont
+from collections import deque
+
+class LineView:
+    TAG = 'linha'  # Marca comum dos itens de texto, usada para mudar a cor de todas as linhas de uma vez
+    FONT_FAMILY = "Helvetica"
+    SAMPLE = "ABCDEFGHIJKLMNOPQRSTUVWXYZ 0123456789,.x"  # Amostra para a largura média dos caracteres
+    font_metrics_cache = {}  # Tamanho da fonte → (altura da linha, largura média de um caractere)
+
+    def __init__(self, canvas, width, height, font_size=8):
+        """
+        Exibe o final do texto de um caixa com um item de texto por linha visível.
+
+        Apenas as linhas que cabem na janela são quebradas e desenhadas, com altura de linha fixa;
+        novas linhas rolam o conteúdo deslocando os itens, e só os itens cujo texto mudou são alterados.
+
+        :param canvas: O canvas do caixa.
+        :param width: A largura do canvas.
+        :param height: A altura do canvas.
+        :param font_size: O tamanho da fonte.
+        """
+        self.canvas = canvas
+        self.items = deque()  # Itens de texto, de cima para baixo
+        self.texts = deque()  # Texto exibido em cada item
+        self.lines = []  # Linhas do último texto recebido
+        self.width = self.height = None
+        self.font_size = font_size
+        self.set_geometry(width, height, font_size)
+
+    @classmethod
+    def font_metrics(cls, canvas, font_size):
+        """
+        Retorna as medidas da fonte, calculadas uma única vez por tamanho.
+
+        :param canvas: Um widget do interpretador Tk.
+        :param font_size: O tamanho da fonte.
+        :return: Tupla (altura da linha, largura média de um caractere).
+        """
+        metrics = cls.font_metrics_cache.get(font_size)
+        if metrics is None:
+            font = tkfont.Font(root=canvas, family=cls.FONT_FAMILY, size=font_size)
+            metrics = (font.metrics('linespace'), font.measure(cls.SAMPLE) / len(cls.SAMPLE))
+            cls.font_metrics_cache[font_size] = metrics
+        return metrics
+
+    def set_geometry(self, width, height, font_size=None, text_width=None):
+        """
+        Ajusta o número de linhas, a largura de quebra e a fonte ao tamanho do canvas e redesenha.
+
+        :param width: A largura do canvas.
+        :param height: A altura do canvas.
+        :param font_size: O tamanho da fonte; por padrão, o atual.
+        :param text_width: A largura de quebra do texto; por padrão, a largura do canvas.
+        """
+        if font_size is not None:
+            self.font_size = font_size
+        self.width, self.height = width, height
+        self.text_width = min(text_width or width, width)
+        self.line_height, char_width = self.font_metrics(self.canvas, self.font_size)
+        self.chars_per_line = max(1, int(self.text_width // char_width))
+        rows = max(1, height // self.line_height)
+
+        fill = self.canvas.itemcget(self.items[0], 'fill') if self.items else "white"
+        while len(self.items) > rows:
+            self.canvas.delete(self.items.pop())
+        while len(self.items) < rows:
+            self.items.append(self.canvas.create_text(0, 0, text="", fill=fill, anchor='n', tags=(self.TAG,)))
+        self.canvas.itemconfig(self.TAG, font=(self.FONT_FAMILY, self.font_size))
+        for row, item in enumerate(self.items):
+            self.canvas.coords(item, width // 2, row * self.line_height)
+        self.texts = deque(None for _ in self.items)  # Força a reescrita de todas as linhas
+        self.show(self.layout())
+
+    def resize(self, width, height):
+        """
+        Ajusta a exibição a um novo tamanho do canvas, se ele mudou.
+
+        :param width: A nova largura.
+        :param height: A nova altura.
+        """
+        if (width, height) != (self.width, self.height):
+            self.set_geometry(width, height)
+
+    def render(self, text):
+        """
+        Exibe o final do texto.
+
+        :param text: O texto visível do caixa.
+        """
+        self.lines = text.split("\n") if text else []
+        self.show(self.layout())
+
+    def layout(self):
+        """
+        Quebra, de baixo para cima, apenas as linhas necessárias para preencher a janela.
+
+        :return: O texto de cada linha da janela; um texto curto fica centralizado na vertical.
+        """
+        rows = len(self.items)
+        display = []
+        for line in reversed(self.lines):
+            if len(line) <= self.chars_per_line:
+                display.append(line)
+            else:
+                display.extend(reversed(textwrap.wrap(line, self.chars_per_line) or [""]))
+            if len(display) >= rows:
+                break
+        display = display[:rows]
+        display.reverse()
+        top = (rows - len(display)) // 2
+        return [""] * top + display + [""] * (rows - top - len(display))
+
+    def show(self, display):
+        """
+        Atualiza os itens para exibir as linhas, rolando quando o conteúdo apenas subiu.
+
+        :param display: O texto de cada linha da janela.
+        """
+        shift = self.find_shift(display)
+        if shift:
+            self.scroll(shift)
+        for row, (item, text) in enumerate(zip(self.items, display)):
+            if self.texts[row] != text:
+                self.canvas.itemconfig(item, text=text)
+                self.texts[row] = text
+
+    def find_shift(self, display):
+        """
+        Descobre quantas linhas o conteúdo exibido subiu.
+
+        :param display: O novo texto de cada linha.
+        :return: O número de linhas roladas ou 0 se não houver rolagem simples.
+        """
+        texts = list(self.texts)
+        if texts == display:
+            return 0
+        for shift in range(1, len(texts)):
+            if texts[shift:] == display[:len(texts) - shift]:
+                return shift if any(texts[shift:]) else 0
+        return 0
+
+    def scroll(self, shift):
+        """
+        Sobe todas as linhas e recicla as que saíram por cima como as novas linhas de baixo.
+
+        :param shift: O número de linhas roladas.
+        """
+        rows = len(self.items)
+        self.canvas.move(self.TAG, 0, -shift * self.line_height)
+        for _ in range(shift):
+            item = self.items.popleft()
+            self.texts.popleft()
+            self.canvas.move(item, 0, rows * self.line_height)
+            self.items.append(item)
+            self.texts.append(None)
@@ -0,0 +1,84 @@
+from datetime import datetime
+
+class Renderer:
+    """
+    Interface de exibição do pipeline. A implementação padrão não exibe nada.
+
+    Todos os métodos são chamados na thread do loop do pipeline.
+    """
+
+    def show_message(self, lane, message, tags):
+        """
+        Recebe cada mensagem assim que é processada.
+
+        :param lane: O nome do caixa.
+        :param message: O texto da mensagem.
+        :param tags: Os tipos de evento marcados na mensagem pelo classificador.
+        """
+
+    def render_lane(self, lane, text):
+        """
+        Exibe o texto visível de um caixa. Chamado no máximo uma vez por quadro para cada caixa alterado.
+
+        :param lane: O nome do caixa.
+        :param text: O texto visível do caixa.
+        """
+
+    def start_alert(self, lane):
+        """
+        Inicia o alerta de inatividade de um caixa.
+
+        :param lane: O nome do caixa.
+        """
+
+    def stop_alert(self, lane):
+        """
+        Encerra o alerta de inatividade de um caixa.
+
+        :param lane: O nome do caixa.
+        """
+
+    def close(self):
+        """
+        Libera os recursos do renderizador ao encerrar o programa.
+        """
+
+class NullRenderer(Renderer):
+    """
+    Descarta toda a exibição; usado pelos relays sem tela, que apenas repassam ao DVR e gravam logs.
+    """
+
+class StreamRenderer(Renderer):
+    def __init__(self, stream, owns_stream=False):
+        """
+        Inicializa o renderizador que escreve cada mensagem e alerta em um fluxo de texto.
+
+        :param stream: O fluxo de saída (sys.stdout ou um arquivo aberto).
+        :param owns_stream: Indica se o fluxo foi aberto para o renderizador e deve ser fechado por close.
+        """
+        self.stream = stream
+        self.owns_stream = owns_stream
+
+    def write_line(self, lane, text):
+        """
+        Escreve uma linha com data, hora e caixa no fluxo.
+
+        :param lane: O nome do caixa.
+        :param text: O texto da linha.
+        """
+        now = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
+        self.stream.write(f"{now} [{lane}] {text}\n")
+        self.stream.flush()
+
+    def show_message(self, lane, message, tags):
+        self.write_line(lane, message.replace('^', ' | '))
+
+    def start_alert(self, lane):
+        self.write_line(lane, "*** tempo sem eventos excedido ***")
+
+    def stop_alert(self, lane):
+        self.write_line(lane, "*** eventos retomados ***")
+
+    def close(self):
+        if self.owns_stream and not self.stream.closed:
+            self.stream.close()
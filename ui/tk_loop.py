@@ -0,0 +1,101 @@
+import threading
+import tkinter as tk
+from collections import deque
+
+class TkLoop:
+    CALL_EVENT = '<<ChamadaExterna>>'
+
+    def __init__(self, root):
+        """
+        Adapta o loop de uma janela Tk à interface de loop do pipeline.
+
+        As chamadas de outras threads não tocam no Tk: ficam na fila e acordam a thread de aviso,
+        que gera o evento virtual. Com o Tk ocupado (janela arrastada, desenho lento), quem espera
+        é a thread de aviso, e não a thread de rede que chamou call_from_thread.
+
+        :param root: A janela cujo mainloop executa o pipeline.
+        """
+        self.root = root
+        self.calls = deque()
+        self.wake = threading.Event()
+        self.running = False
+        self.root.bind(self.CALL_EVENT, lambda e: self.run_calls())
+
+    def after(self, ms, func, *args):
+        """
+        Agenda uma função no loop do Tk.
+
+        :param ms: O intervalo em milissegundos.
+        :param func: A função a ser executada.
+        :param args: Os argumentos da função.
+        :return: O identificador do agendamento.
+        """
+        return self.root.after(ms, func, *args)
+
+    def after_cancel(self, after_id):
+        """
+        Cancela um agendamento feito com after.
+
+        :param after_id: O identificador do agendamento.
+        """
+        self.root.after_cancel(after_id)
+
+    def pending(self):
+        """
+        Retorna o número de agendamentos pendentes no Tk, inclusive os feitos direto nas janelas.
+
+        :return: O número de callbacks de after ainda não executados.
+        """
+        return len(self.root.tk.splitlist(self.root.tk.call('after', 'info')))
+
+    def call_from_thread(self, func, *args):
+        """
+        Agenda uma função a partir de outra thread e acorda a thread de aviso, sem esperar pelo Tk.
+
+        :param func: A função a ser executada na thread do Tk.
+        :param args: Os argumentos da função.
+        """
+        self.calls.append((func, args))
+        self.wake.set()
+
+    def notify(self):
+        """
+        Thread de aviso: a cada chamada recebida, acorda o loop do Tk com um evento virtual.
+        """
+        while True:
+            self.wake.wait()
+            self.wake.clear()
+            if not self.running:
+                break
+            try:
+                self.root.event_generate(self.CALL_EVENT, when='tail')
+            except (RuntimeError, tk.TclError):
+                # O loop principal não está ativo; a chamada é executada quando ele iniciar
+                pass
+
+    def run_calls(self):
+        """
+        Executa as chamadas recebidas de outras threads.
+        """
+        while self.calls:
+            func, args = self.calls.popleft()
+            func(*args)
+
+    def run(self):
+        """
+        Executa o mainloop do Tk, com a thread de aviso ativa enquanto ele durar.
+        """
+        self.running = True
+        threading.Thread(target=self.notify, name="TkNotify", daemon=True).start()
+        self.root.after_idle(self.run_calls)
+        try:
+            self.root.mainloop()
+        finally:
+            self.running = False
+            self.wake.set()
+
+    def stop(self):
+        """
+        Encerra o mainloop do Tk.
+        """
+        self.root.quit()
@@ -0,0 +1,43 @@
+import tkinter as tk
+
+class WindowManager:
+    def __init__(self):
+        """
+        Gerencia as janelas dos caixas em um único interpretador Tk: uma raiz oculta, que
+        executa o loop de eventos, e uma Toplevel por caixa.
+        """
+        self.root = tk.Tk()
+        self.root.withdraw()  # A raiz não é a janela de nenhum caixa
+        self.windows = {}
+
+    def create_window(self, name, x, y, width, height):
+        """
+        Cria a janela de um caixa.
+
+        :param name: O nome do caixa.
+        :param x: Posição X da janela.
+        :param y: Posição Y da janela.
+        :param width: Largura da janela.
+        :param height: Altura da janela.
+        :return: A janela criada.
+        """
+        window = tk.Toplevel(self.root)
+        self.configure_window(window, x, y, width, height)
+        self.windows[name] = window
+        return window
+
+    def configure_window(self, window, x, y, width, height):
+        """
+        Configura uma janela específica com as dimensões e posição fornecidas.
+
+        :param window: A janela a ser configurada.
+        :param x: Posição X da janela.
+        :param y: Posição Y da janela.
+        :param width: Largura da janela.
+        :param height: Altura da janela.
+        """
+        print(f"x: {x} y: {y} width: {width} height: {height}")
+        window.attributes('-topmost', True)
+        window.attributes('-alpha', 0.9)
+        window.overrideredirect(True)
+        window.geometry(f"{width}x{height}+{x}+{y}")
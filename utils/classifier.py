@@ -0,0 +1,43 @@
+import re
+
+class MessageClassifier:
+    def __init__(self, event_keywords):
+        """
+        Inicializa o classificador com uma única expressão regular para todas as palavras-chave.
+        A expressão é aplicada aos bytes recebidos (UTF-8), sem decodificar a mensagem.
+
+        :param event_keywords: Mapeamento ordenado de tipo de evento para suas palavras-chave.
+        """
+        self.flags = {}
+        alternatives = []
+        for index, (event, keywords) in enumerate(event_keywords.items()):
+            self.flags[event] = 1 << index
+            encoded = sorted((keyword.encode('utf-8') for keyword in keywords), key=len, reverse=True)
+            group = b"|".join(re.escape(keyword) for keyword in encoded)
+            alternatives.append(b"(?P<e%d>%s)" % (index, group))
+        self.all_flags = (1 << len(self.flags)) - 1
+        self.group_flags = {f"e{index}": 1 << index for index in range(len(self.flags))}
+        self.pattern = re.compile(b"|".join(alternatives))
+
+    def flag(self, event):
+        """
+        Retorna o bit que representa um tipo de evento.
+
+        :param event: O nome do tipo de evento.
+        :return: O bit do evento nas marcações retornadas por classify.
+        """
+        return self.flags[event]
+
+    def classify(self, message):
+        """
+        Marca a mensagem com os tipos de evento encontrados, percorrendo-a uma única vez.
+
+        :param message: Os bytes da mensagem (bytes, bytearray ou memoryview).
+        :return: Inteiro com um bit ligado para cada tipo de evento presente.
+        """
+        tags = 0
+        for match in self.pattern.finditer(message):
+            tags |= self.group_flags[match.lastgroup]
+            if tags == self.all_flags:
+                break
+        return tags
@@ -0,0 +1,92 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+class EventLoop:
+    def __init__(self):
+        """
+        Inicializa o loop de eventos usado no modo sem tela, com a mesma interface de
+        agendamento (after/after_cancel) de uma janela Tk.
+        """
+        self.timers = []
+        self.cancelled = set()
+        self.calls = deque()
+        self.condition = threading.Condition()
+        self.counter = itertools.count(1)
+        self.running = False
+
+    def after(self, ms, func, *args):
+        """
+        Agenda uma função para ser executada após um intervalo.
+
+        :param ms: O intervalo em milissegundos.
+        :param func: A função a ser executada.
+        :param args: Os argumentos da função.
+        :return: O identificador do agendamento.
+        """
+        timer_id = next(self.counter)
+        with self.condition:
+            heapq.heappush(self.timers, (time.monotonic() + ms / 1000, timer_id, func, args))
+            self.condition.notify()
+        return timer_id
+
+    def after_cancel(self, timer_id):
+        """
+        Cancela um agendamento feito com after.
+
+        :param timer_id: O identificador do agendamento.
+        """
+        with self.condition:
+            self.cancelled.add(timer_id)
+
+    def pending(self):
+        """
+        Retorna o número de agendamentos pendentes.
+
+        :return: O número de funções agendadas com after ainda não executadas nem canceladas.
+        """
+        with self.condition:
+            return len(self.timers) - len(self.cancelled)
+
+    def call_from_thread(self, func, *args):
+        """
+        Agenda uma função a partir de outra thread e acorda o loop.
+
+        :param func: A função a ser executada na thread do loop.
+        :param args: Os argumentos da função.
+        """
+        with self.condition:
+            self.calls.append((func, args))
+            self.condition.notify()
+
+    def run(self):
+        """
+        Executa o loop até que stop seja chamado.
+        """
+        self.running = True
+        while self.running:
+            with self.condition:
+                while self.running and not self.calls:
+                    now = time.monotonic()
+                    if self.timers and self.timers[0][0] <= now:
+                        break
+                    self.condition.wait(self.timers[0][0] - now if self.timers else None)
+                ready = list(self.calls)
+                self.calls.clear()
+                now = time.monotonic()
+                while self.timers and self.timers[0][0] <= now:
+                    _when, timer_id, func, args = heapq.heappop(self.timers)
+                    if timer_id in self.cancelled:
+                        self.cancelled.discard(timer_id)
+                    else:
+                        ready.append((func, args))
+            for func, args in ready:
+                func(*args)
+
+    def stop(self):
+        """
+        Encerra o loop. Pode ser chamado de qualquer thread.
+        """
+        self.call_from_thread(setattr, self, 'running', False)
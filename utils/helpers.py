@@ -1,56 +1,116 @@
+import time
+from collections import deque
 from datetime import datetime
+from itertools import islice
+from utils.log_index import IndexEntry, TransactionFields
 
-class CanvasHelper:
-    def __init__(self, text_id_map, file_map):
+class LineStore:
+    def __init__(self, file_map, max_lines=2000, visible_lines=200, log_writer=None, id_patterns=None):
         """
-        Inicializa a classe CanvasHelper com os mapas de IDs de texto e arquivos.
+        Inicializa o armazenamento de linhas das transações de cada caixa.
 
-        :param text_id_map: Mapeamento de IDs de texto para os canvas.
-        :param file_map: Mapeamento de arquivos para os canvas.
+        :param file_map: Mapeamento do nome de cada caixa para seu arquivo de log.
+        :param max_lines: Número máximo de linhas mantidas em memória por caixa.
+        :param visible_lines: Número de linhas finais enviadas à exibição a cada atualização.
+        :param log_writer: Gravador de logs em segundo plano; se None, a gravação é síncrona (e sem índice).
+        :param id_patterns: Expressões dos identificadores da transação indexados (pdv, transaction, operator).
         """
-        self.text_id_map = text_id_map
         self.file_map = file_map
+        self.log_writer = log_writer
+        self.visible_lines = visible_lines
+        self.transaction_fields = TransactionFields(id_patterns or {})
+        # O buffer de linhas é a fonte da verdade; a exibição recebe apenas o final visível
+        self.line_buffers = {lane: deque(maxlen=max_lines) for lane in file_map}
+        # Dados da transação em andamento de cada caixa, usados na entrada do índice ao salvá-la
+        now = time.time()
+        self.transactions = {lane: IndexEntry(now, now) for lane in file_map}
+
+    def get_text(self, lane):
+        """
+        Retorna todo o texto armazenado no buffer do caixa.
+
+        :param lane: O nome do caixa.
+        :return: As linhas do buffer unidas por quebras de linha.
+        """
+        return "\n".join(self.line_buffers[lane])
 
-    def save_to_file(self, canvas, filename):
+    def get_visible_text(self, lane):
         """
-        Salva o conteúdo do canvas em um arquivo.
+        Retorna apenas as últimas linhas do buffer, que cabem na exibição.
 
-        :param canvas: O canvas cujo conteúdo será salvo.
+        :param lane: O nome do caixa.
+        :return: As últimas visible_lines linhas unidas por quebras de linha.
+        """
+        tail = list(islice(reversed(self.line_buffers[lane]), self.visible_lines))
+        tail.reverse()
+        return "\n".join(tail)
+
+    def save_to_file(self, lane, filename):
+        """
+        Salva a transação do caixa em um arquivo.
+
+        :param lane: O nome do caixa cuja transação será salva.
         :param filename: O nome do arquivo onde o conteúdo será salvo.
         """
-        content = canvas.itemcget(self.text_id_map[canvas], "text")
-        now = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        content = self.get_text(lane)
+        saved = time.time()
+        now = datetime.fromtimestamp(saved).strftime("%Y-%m-%d_%H-%M-%S")
+        if self.log_writer is not None:
+            entry = self.transactions[lane]
+            entry.saved = saved
+            self.log_writer.write(filename, f"{now}\n{content}\n", entry)
+            return
         with open(filename, 'a') as file:
             file.write(f"{now}\n{content}\n")
 
-    def update_text(self, canvas, text_id, message):
+    def apply_message(self, lane, message, new_transaction, tags=0):
         """
-        Atualiza o texto do canvas com a nova mensagem.
+        Aplica a mensagem ao buffer de linhas do caixa.
 
-        :param canvas: O canvas cujo texto será atualizado.
-        :param text_id: O ID do texto no canvas.
-        :param message: A nova mensagem a ser exibida no canvas.
+        :param lane: O nome do caixa cujo buffer será atualizado.
+        :param message: A nova mensagem recebida.
+        :param new_transaction: Indica se a mensagem marca o início de uma transação.
+        :param tags: Os tipos de evento marcados na mensagem, acumulados na entrada do índice.
         """
-        current_text = canvas.itemcget(text_id, "text")
-        dataehora = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
-        
+        lines = self.line_buffers[lane]
+
         # Verifica se a mensagem atual contém palavras específicas
-        if any(keyword in message for keyword in ["PDV", "Trans", "Atend"]):
+        if new_transaction:
             print(f"Palavras identificadas na mensagem: {message}")
-            # Salva o conteúdo da tela e reinicia a captura
-            self.save_to_file(canvas, self.file_map[canvas])
+            # Salva a transação anterior e reinicia a captura
+            self.save_to_file(lane, self.file_map[lane])
             # Limpa o texto e adiciona a data e hora
-            canvas.itemconfig(text_id, text=dataehora)
+            started = time.time()
+            self.transactions[lane] = IndexEntry(started, started, tags, **self.transaction_fields.extract(message))
+            lines.clear()
+            lines.append(datetime.fromtimestamp(started).strftime("%d-%m-%Y %H:%M:%S"))
         else:
-            # Atualiza o texto do canvas com a nova mensagem
-            formatted_text = message.replace('^', '\n')
-            updated_text = f"{current_text}\n{formatted_text}"
-            canvas.itemconfig(text_id, text=updated_text)
-        
+            # Acrescenta cada item da mensagem como uma linha do buffer
+            self.transactions[lane].tags |= tags
+            lines.extend(message.split('^'))
+
+class CanvasHelper:
+    def __init__(self, text_id_map):
+        """
+        Inicializa a classe CanvasHelper com o mapa de IDs de texto.
+
+        :param text_id_map: Mapeamento de IDs de texto para os canvas.
+        """
+        self.text_id_map = text_id_map
+
+    def render(self, canvas, text):
+        """
+        Redesenha o canvas com o texto visível e rola para a parte inferior.
+
+        :param canvas: O canvas a ser redesenhado.
+        :param text: O texto visível do caixa.
+        """
+        canvas.itemconfig(self.text_id_map[canvas], text=text)
+
         canvas.update_idletasks()
-        
+
         # Ajuste da área de rolagem
         canvas.configure(scrollregion=canvas.bbox("all"))
-        
+
         # Rola para a parte inferior
         canvas.yview_moveto(1.0)
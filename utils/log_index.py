@@ -0,0 +1,269 @@
+import glob
+import gzip
+import mmap
+import os
+import re
+import struct
+from datetime import datetime
+
+# Posição e tamanho do bloco no log, início da transação, gravação, tipos de evento, PDV, transação, operador
+ENTRY = struct.Struct('<QIddI16s16s16s')
+FIELDS = ('pdv', 'transaction', 'operator')
+SAVE_STAMP = re.compile(rb'^(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})\r?$')
+START_STAMP = re.compile(rb'^(\d{2}-\d{2}-\d{4} \d{2}:\d{2}:\d{2})\r?$')
+
+def index_name(log_path):
+    """
+    Retorna o caminho do índice de um arquivo de log (ativo, rotacionado ou compactado).
+
+    :param log_path: O caminho do arquivo de log.
+    :return: O caminho do índice.
+    """
+    if log_path.endswith('.gz'):
+        log_path = log_path[:-3]
+    return log_path + '.idx'
+
+def parse_time(text):
+    """
+    Converte uma data/hora ISO (ex.: "2026-10-18 14:00") no instante correspondente.
+
+    :param text: O texto da data/hora ou None.
+    :return: O instante em time.time() ou None.
+    """
+    return datetime.fromisoformat(text).timestamp() if text else None
+
+class IndexEntry:
+    def __init__(self, started, saved, tags=0, pdv="", transaction="", operator="", offset=0, length=0):
+        """
+        Descreve um bloco (transação) gravado no log.
+
+        :param started: O instante de início da transação, em time.time().
+        :param saved: O instante da gravação do bloco, em time.time().
+        :param tags: Os tipos de evento das mensagens do bloco (bits do classificador).
+        :param pdv: O número do PDV informado na abertura da transação.
+        :param transaction: O número da transação.
+        :param operator: O operador que atendeu.
+        :param offset: A posição do bloco no arquivo de log, em bytes.
+        :param length: O tamanho do bloco, em bytes.
+        """
+        self.started = started
+        self.saved = saved
+        self.tags = tags
+        self.pdv = pdv
+        self.transaction = transaction
+        self.operator = operator
+        self.offset = offset
+        self.length = length
+
+    def pack(self):
+        """
+        Codifica a entrada no formato de tamanho fixo do índice.
+
+        :return: Os bytes da entrada.
+        """
+        return ENTRY.pack(
+            self.offset, self.length, self.started, self.saved, self.tags,
+            self.pdv.encode('utf-8')[:16], self.transaction.encode('utf-8')[:16], self.operator.encode('utf-8')[:16],
+        )
+
+    @classmethod
+    def unpack_from(cls, buffer, offset=0):
+        """
+        Decodifica uma entrada do índice.
+
+        :param buffer: Os bytes do índice.
+        :param offset: A posição da entrada.
+        :return: A entrada decodificada.
+        """
+        position, length, started, saved, tags, pdv, transaction, operator = ENTRY.unpack_from(buffer, offset)
+        return cls(
+            started, saved, tags,
+            pdv.rstrip(b'\0').decode('utf-8', errors='replace'),
+            transaction.rstrip(b'\0').decode('utf-8', errors='replace'),
+            operator.rstrip(b'\0').decode('utf-8', errors='replace'),
+            position, length,
+        )
+
+    def matches(self, **ids):
+        """
+        Verifica se a entrada tem os identificadores informados.
+
+        :param ids: Identificadores a comparar (pdv, transaction, operator); None é ignorado.
+        :return: True se todos os identificadores informados coincidirem.
+        """
+        return all(value is None or getattr(self, field) == value for field, value in ids.items())
+
+class TransactionFields:
+    def __init__(self, patterns):
+        """
+        Extrai os identificadores da mensagem de abertura de transação.
+
+        :param patterns: Mapeamento do campo (pdv, transaction, operator) para uma expressão
+            regular cujo primeiro grupo é o valor.
+        """
+        self.patterns = {field: re.compile(pattern) for field, pattern in patterns.items() if field in FIELDS}
+
+    def extract(self, message):
+        """
+        Retorna os identificadores encontrados na mensagem.
+
+        :param message: O texto da mensagem de abertura.
+        :return: Dicionário campo → valor; os campos ausentes ficam vazios.
+        """
+        ids = dict.fromkeys(FIELDS, "")
+        for field, pattern in self.patterns.items():
+            match = pattern.search(message)
+            if match:
+                ids[field] = match.group(1)
+        return ids
+
+class LogIndex:
+    def __init__(self, path):
+        """
+        Lê um índice de log mapeado em memória. As entradas estão na ordem de gravação,
+        e portanto ordenadas pelo instante de gravação, o que permite busca binária por tempo.
+
+        :param path: O caminho do índice.
+        """
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.count = size // ENTRY.size  # Uma entrada incompleta no fim é ignorada
+
+    def __len__(self):
+        return self.count
+
+    def entry(self, position):
+        """
+        Retorna a entrada de uma posição do índice.
+
+        :param position: A posição da entrada.
+        :return: A entrada.
+        """
+        return IndexEntry.unpack_from(self.map, position * ENTRY.size)
+
+    def first_saved_after(self, start):
+        """
+        Busca binária da primeira entrada gravada a partir de um instante.
+
+        :param start: O instante, em time.time().
+        :return: A posição da primeira entrada com gravação em start ou depois.
+        """
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.entry(middle).saved < start:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def search(self, start=None, end=None):
+        """
+        Percorre as entradas cujos blocos se sobrepõem ao intervalo informado.
+
+        :param start: O instante inicial ou None.
+        :param end: O instante final ou None.
+        :return: Gerador de entradas.
+        """
+        position = 0 if start is None else self.first_saved_after(start)
+        while position < self.count:
+            entry = self.entry(position)
+            if end is not None and entry.started > end:
+                break
+            yield entry
+            position += 1
+
+    def close(self):
+        """
+        Libera o mapeamento e fecha o arquivo.
+        """
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+def log_files(filename):
+    """
+    Lista o log ativo e seus arquivos rotacionados (compactados ou não), do mais antigo ao mais novo.
+
+    :param filename: O caminho do log ativo.
+    :return: Lista de caminhos existentes.
+    """
+    base, ext = os.path.splitext(filename)
+    rotated = glob.glob(f"{glob.escape(base)}.*{ext}") + glob.glob(f"{glob.escape(base)}.*{ext}.gz")
+    files = sorted((path for path in rotated if not path.endswith('.idx')), key=os.path.getmtime)
+    if os.path.exists(filename):
+        files.append(filename)
+    return files
+
+def read_block(log_path, entry):
+    """
+    Lê um bloco do log posicionando-se diretamente nele.
+
+    :param log_path: O caminho do arquivo de log (compactado ou não).
+    :param entry: A entrada do índice.
+    :return: O texto do bloco.
+    """
+    opener = gzip.open if log_path.endswith('.gz') else open
+    with opener(log_path, 'rb') as file:
+        file.seek(entry.offset)
+        return file.read(entry.length).decode('utf-8', errors='replace')
+
+def find_blocks(filename, start=None, end=None, keyword=None, **ids):
+    """
+    Busca os blocos de um log (incluindo os rotacionados) pelo índice, lendo apenas os candidatos.
+
+    :param filename: O caminho do log ativo do caixa.
+    :param start: O instante inicial, em time.time(), ou None.
+    :param end: O instante final, em time.time(), ou None.
+    :param keyword: Texto que deve constar no bloco ou None.
+    :param ids: Identificadores exigidos (pdv, transaction, operator).
+    :return: Gerador de tuplas (caminho do log, entrada, texto do bloco).
+    """
+    for log_path in log_files(filename):
+        try:
+            index = LogIndex(index_name(log_path))
+        except OSError:
+            continue
+        try:
+            for entry in index.search(start, end):
+                if not entry.matches(**ids):
+                    continue
+                text = read_block(log_path, entry)
+                if keyword is None or keyword in text:
+                    yield log_path, entry, text
+        finally:
+            index.close()
+
+def rebuild_index(log_path):
+    """
+    Gera o índice de um log gravado sem índice, separando os blocos pela linha de data de gravação.
+    Os identificadores da transação não constam no texto do log e ficam vazios.
+    Não deve ser usado no log ativo enquanto o programa estiver gravando.
+
+    :param log_path: O caminho do arquivo de log (compactado ou não).
+    :return: O número de blocos indexados.
+    """
+    opener = gzip.open if log_path.endswith('.gz') else open
+    entries = []
+    offset = 0
+    expect_start = False  # A linha seguinte à data de gravação traz o início da transação
+    with opener(log_path, 'rb') as file:
+        for line in file:
+            stamp = SAVE_STAMP.match(line)
+            if stamp:
+                saved = datetime.strptime(stamp.group(1).decode(), "%Y-%m-%d_%H-%M-%S").timestamp()
+                entries.append(IndexEntry(saved, saved, offset=offset))
+                expect_start = True
+            elif expect_start:
+                start = START_STAMP.match(line)
+                if start:
+                    entries[-1].started = datetime.strptime(start.group(1).decode(), "%d-%m-%Y %H:%M:%S").timestamp()
+                expect_start = False
+            offset += len(line)
+            if entries:
+                entries[-1].length = offset - entries[-1].offset
+    with open(index_name(log_path), 'wb') as index_file:
+        for entry in entries:
+            index_file.write(entry.pack())
+    return len(entries)
@@ -0,0 +1,216 @@
+import atexit
+import gzip
+import os
+import shutil
+import threading
+import time
+from datetime import date, datetime
+from queue import Empty, Queue
+from utils.log_index import index_name
+from utils.metrics import metrics_instance
+
+class LogWriter:
+    def __init__(self, flush_interval=1.0, fsync=False, max_bytes=50 * 1024 * 1024, rotate_daily=True, compress=True):
+        """
+        Inicializa o gravador de logs em segundo plano.
+
+        :param flush_interval: Intervalo, em segundos, entre as gravações em lote.
+        :param fsync: Indica se cada lote deve ser forçado ao disco com os.fsync.
+        :param max_bytes: Tamanho a partir do qual o arquivo é rotacionado (0 desativa).
+        :param rotate_daily: Indica se o arquivo deve ser rotacionado na virada do dia.
+        :param compress: Indica se os arquivos rotacionados devem ser compactados com gzip.
+        """
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.compress = compress
+        self.queue = Queue()
+        self.files = {}
+        self.file_days = {}
+        self.thread = None
+
+    def start(self):
+        """
+        Inicia a thread de gravação e garante a descarga final ao encerrar o programa.
+        """
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self.run, name="LogWriter", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def write(self, filename, text, entry=None):
+        """
+        Enfileira um texto para ser acrescentado ao arquivo. Não bloqueia.
+
+        :param filename: O nome do arquivo de destino.
+        :param text: O texto a ser acrescentado.
+        :param entry: Entrada do índice do bloco (IndexEntry), completada com a posição e o
+            tamanho do texto no arquivo e acrescentada ao índice; None para não indexar.
+        """
+        self.queue.put((filename, text, entry))
+
+    def close(self, timeout=5.0):
+        """
+        Grava o que estiver pendente, fecha os arquivos e encerra a thread. Pode ser chamado
+        mais de uma vez; o encerramento explícito dispensa o feito ao sair do programa.
+
+        :param timeout: A espera máxima pela thread de gravação, em segundos.
+        """
+        thread, self.thread = self.thread, None
+        if thread is None:
+            return
+        atexit.unregister(self.close)
+        self.queue.put(None)
+        thread.join(timeout)
+        if thread.is_alive():
+            print(f"A gravação dos logs não terminou em {timeout} s; entradas pendentes podem ter sido perdidas")
+
+    def run(self):
+        """
+        Loop da thread de gravação: acumula as entradas do intervalo e as grava em lote.
+        """
+        running = True
+        while running:
+            batch = {}
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    running = False
+                    break
+                filename, text, entry = item
+                batch.setdefault(filename, []).append((text, entry))
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except Empty:
+                    break
+            for filename, items in batch.items():
+                started_at = time.perf_counter()
+                try:
+                    self.write_batch(filename, items)
+                except OSError as e:
+                    print(f"Erro ao gravar log {filename}: {e}")
+                if metrics_instance.enabled:
+                    metrics_instance.observe('log_write', time.perf_counter() - started_at)
+        for filename in list(self.files):
+            self.close_file(filename)
+
+    def write_batch(self, filename, items):
+        """
+        Grava um lote em um arquivo, rotacionando-o antes se necessário, e acrescenta ao
+        índice as entradas dos blocos gravados. O índice é gravado depois do log, para nunca
+        apontar para dados ainda não gravados.
+
+        :param filename: O nome do arquivo de destino.
+        :param items: Lista de tuplas (texto, entrada do índice ou None) do lote.
+        """
+        file = self.open_file(filename)
+        if self.should_rotate(filename, file):
+            self.rotate(filename)
+            file = self.open_file(filename)
+        entries = []
+        pending = []
+        for text, entry in items:
+            if entry is None:
+                pending.append(text)
+                continue
+            if pending:
+                file.write("".join(pending))
+                pending = []
+            entry.offset = file.tell()
+            file.write(text)
+            entry.length = file.tell() - entry.offset
+            entries.append(entry)
+        if pending:
+            file.write("".join(pending))
+        file.flush()
+        if self.fsync:
+            os.fsync(file.fileno())
+        if entries:
+            with open(index_name(filename), 'ab') as index_file:
+                index_file.write(b"".join(entry.pack() for entry in entries))
+
+    def open_file(self, filename):
+        """
+        Retorna o arquivo aberto para acréscimo, abrindo-o se necessário.
+
+        :param filename: O nome do arquivo.
+        :return: O objeto de arquivo.
+        """
+        file = self.files.get(filename)
+        if file is None:
+            file = open(filename, 'a', encoding='utf-8', errors='replace')
+            self.files[filename] = file
+            if file.tell() > 0:
+                self.file_days[filename] = date.fromtimestamp(os.path.getmtime(filename))
+            else:
+                self.file_days[filename] = date.today()
+        return file
+
+    def close_file(self, filename):
+        """
+        Fecha um arquivo aberto pelo gravador.
+
+        :param filename: O nome do arquivo.
+        """
+        file = self.files.pop(filename, None)
+        self.file_days.pop(filename, None)
+        if file is not None:
+            file.close()
+
+    def should_rotate(self, filename, file):
+        """
+        Verifica se o arquivo atingiu o tamanho máximo ou se o dia mudou.
+
+        :param filename: O nome do arquivo.
+        :param file: O objeto de arquivo aberto.
+        :return: True se o arquivo deve ser rotacionado.
+        """
+        if file.tell() == 0:
+            return False
+        if self.max_bytes and file.tell() >= self.max_bytes:
+            return True
+        return self.rotate_daily and self.file_days[filename] != date.today()
+
+    def rotated_name(self, filename):
+        """
+        Gera um nome ainda não usado para o arquivo rotacionado.
+
+        :param filename: O nome do arquivo ativo.
+        :return: O nome do arquivo rotacionado, com data e hora.
+        """
+        base, ext = os.path.splitext(filename)
+        stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        candidate = f"{base}.{stamp}{ext}"
+        counter = 1
+        while os.path.exists(candidate) or os.path.exists(candidate + ".gz"):
+            candidate = f"{base}.{stamp}-{counter}{ext}"
+            counter += 1
+        return candidate
+
+    def rotate(self, filename):
+        """
+        Renomeia o arquivo ativo (e seu índice) e, se configurado, compacta a cópia rotacionada.
+
+        :param filename: O nome do arquivo ativo.
+        :return: O nome final do arquivo rotacionado.
+        """
+        self.close_file(filename)
+        rotated = self.rotated_name(filename)
+        os.replace(filename, rotated)
+        if os.path.exists(index_name(filename)):
+            os.replace(index_name(filename), index_name(rotated))
+        if not self.compress:
+            return rotated
+        with open(rotated, 'rb') as source, gzip.open(rotated + ".gz", 'wb') as target:
+            shutil.copyfileobj(source, target)
+        os.remove(rotated)
+        return rotated + ".gz"
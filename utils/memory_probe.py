@@ -0,0 +1,139 @@
+import gc
+import os
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+def rss_bytes():
+    """
+    Retorna a memória residente (RSS) do processo.
+
+    Usa o psutil, se instalado; sem ele, lê /proc/self/statm (Linux).
+
+    :return: O RSS em bytes ou None se não puder ser medido.
+    """
+    try:
+        import psutil  # Dependência opcional
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class MemoryProbe:
+    def __init__(self):
+        """
+        Inicializa a sonda de memória: RSS, memória rastreada pelo tracemalloc e contadores
+        de estruturas que não devem crescer ao longo do turno (agendamentos, filas, texto dos canvas).
+        """
+        self.counters = {}  # Nome → função sem argumentos que retorna a contagem atual
+        self.baseline = None  # Snapshot do tracemalloc usado como referência nos relatórios
+        self.loop = None  # Loop em cuja thread as contagens podem ser lidas (Tk ou EventLoop)
+
+    def start(self, frames=1):
+        """
+        Liga o tracemalloc, se ainda não estiver ligado, e guarda o snapshot de referência.
+
+        :param frames: O número de quadros de pilha guardados por alocação.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.baseline = tracemalloc.take_snapshot()
+
+    def add_counter(self, name, func):
+        """
+        Registra uma contagem incluída em cada amostra.
+
+        :param name: O nome da contagem.
+        :param func: Função sem argumentos que retorna o valor atual.
+        """
+        self.counters[name] = func
+
+    def sample(self):
+        """
+        Mede a memória e as contagens registradas, após uma coleta de lixo.
+
+        :return: Dicionário nome → valor, com 'rss' e 'traced' em bytes (None se indisponíveis).
+        """
+        gc.collect()
+        values = {
+            'rss': rss_bytes(),
+            'traced': tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+        }
+        for name, func in list(self.counters.items()):
+            values[name] = func()
+        return values
+
+    def report(self, limit=25):
+        """
+        Monta o relatório das maiores alocações e do crescimento desde o snapshot de referência.
+
+        :param limit: O número de linhas de cada lista.
+        :return: O texto do relatório.
+        """
+        lines = [f"Relatório de memória {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"]
+        for name, value in self.sample().items():
+            lines.append(f"  {name:<24} {value}")
+        if not tracemalloc.is_tracing():
+            self.start()
+            lines.append("tracemalloc ligado agora; as alocações aparecem a partir do próximo relatório")
+            return "\n".join(lines) + "\n"
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        lines.append(f"Maiores alocações (top {limit}):")
+        for stat in snapshot.statistics('lineno')[:limit]:
+            lines.append(f"  {stat}")
+        if self.baseline is not None:
+            lines.append(f"Maior crescimento desde a referência (top {limit}):")
+            for stat in snapshot.compare_to(self.baseline, 'lineno')[:limit]:
+                lines.append(f"  {stat}")
+        return "\n".join(lines) + "\n"
+
+    def report_from_thread(self, timeout=5.0):
+        """
+        Monta o relatório na thread do loop, onde as contagens registradas (agendamentos do Tk,
+        texto dos canvas) podem ser lidas com segurança, e espera o resultado. Usado pelas
+        threads que não são a do loop, como a do endpoint HTTP.
+
+        :param timeout: A espera máxima pelo loop, em segundos.
+        :return: O texto do relatório ou um aviso se o loop não responder a tempo.
+        """
+        loop = self.loop
+        if loop is None:
+            return self.report()
+        done = threading.Event()
+        result = []
+
+        def build():
+            try:
+                result.append(self.report())
+            finally:
+                done.set()
+
+        loop.call_from_thread(build)
+        if not done.wait(timeout) or not result:
+            return "O loop não respondeu; relatório de memória indisponível\n"
+        return result[0]
+
+    def dump(self, directory='.'):
+        """
+        Grava o relatório de memória em um arquivo com data e hora no nome.
+
+        :param directory: O diretório do arquivo.
+        :return: O caminho do arquivo gravado.
+        """
+        path = os.path.join(directory, time.strftime("memory_report_%Y-%m-%d_%H-%M-%S.txt"))
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.report())
+        print(f"Relatório de memória gravado em {path}")
+        return path
+
+# Instância global da classe MemoryProbe
+memory_probe = MemoryProbe()
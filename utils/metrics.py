@@ -0,0 +1,206 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+
+class Histogram:
+    def __init__(self, bounds):
+        """
+        Inicializa um histograma de faixas fixas, no formato do Prometheus.
+
+        :param bounds: Os limites superiores das faixas, em ordem crescente.
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """
+        Registra uma observação.
+
+        :param value: O valor observado.
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Metrics:
+    PREFIX = 'selfcheckout'
+    LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self, enabled=False):
+        """
+        Inicializa o registro de métricas do pipeline.
+
+        Os pontos de medição consultam enabled antes de medir, para que o custo seja desprezível
+        quando as métricas estão desligadas. Cada métrica é atualizada por uma única thread.
+
+        :param enabled: Indica se as métricas devem ser coletadas.
+        """
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+        self.server = None
+
+    def inc(self, name, lane, value=1):
+        """
+        Incrementa um contador por caixa.
+
+        :param name: O nome do contador.
+        :param lane: O nome do caixa.
+        :param value: O incremento.
+        """
+        key = (name, lane)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, stage, seconds):
+        """
+        Registra a latência de um estágio do pipeline.
+
+        :param stage: O nome do estágio.
+        :param seconds: A latência em segundos.
+        """
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = Histogram(self.LATENCY_BUCKETS)
+        histogram.observe(seconds)
+
+    def set_gauge(self, name, func, labels=""):
+        """
+        Registra um indicador lido no momento da exportação.
+
+        :param name: O nome do indicador.
+        :param func: Função sem argumentos que retorna o valor atual.
+        :param labels: Os rótulos no formato do Prometheus (ex.: 'lane="pdv1"').
+        """
+        self.gauges[(name, labels)] = func
+
+    def snapshot(self, exclude=()):
+        """
+        Copia os contadores, os histogramas e os valores atuais dos indicadores, para envio
+        a outro processo.
+
+        :param exclude: Prefixos dos nomes dos indicadores que não devem ser copiados.
+        :return: Dicionário com 'counters', 'histograms' e 'gauges'.
+        """
+        return {
+            'counters': dict(self.counters),
+            'histograms': dict(self.histograms),
+            'gauges': {key: func() for key, func in list(self.gauges.items()) if not key[0].startswith(exclude)},
+        }
+
+    def merge(self, snapshot):
+        """
+        Incorpora as métricas contadas em outro processo (o de recepção), substituindo os valores
+        recebidos antes. Chamado sempre pela mesma thread.
+
+        :param snapshot: O dicionário gerado por snapshot no outro processo.
+        """
+        self.counters.update(snapshot['counters'])
+        self.histograms.update(snapshot['histograms'])
+        for key, value in snapshot['gauges'].items():
+            self.gauges[key] = lambda value=value: value
+
+    def render(self):
+        """
+        Gera o texto de exportação no formato de texto do Prometheus.
+
+        :return: O texto com todos os contadores, indicadores e histogramas.
+        """
+        # Cópias instantâneas: as outras threads continuam atualizando as métricas
+        counters = sorted(list(self.counters.items()))
+        gauges = sorted(list(self.gauges.items()), key=lambda item: item[0])
+        histograms = sorted(list(self.histograms.items()))
+        lines = []
+        for name in sorted({name for (name, _lane), _value in counters}):
+            lines.append(f"# TYPE {self.PREFIX}_{name}_total counter")
+            for (counter, lane), value in counters:
+                if counter == name:
+                    lines.append(f'{self.PREFIX}_{name}_total{{lane="{lane}"}} {value}')
+        for name in sorted({name for (name, _labels), _func in gauges}):
+            lines.append(f"# TYPE {self.PREFIX}_{name} gauge")
+            for (gauge, labels), func in gauges:
+                if gauge == name:
+                    label_text = f"{{{labels}}}" if labels else ""
+                    lines.append(f"{self.PREFIX}_{name}{label_text} {func()}")
+        if histograms:
+            name = f"{self.PREFIX}_stage_latency_seconds"
+            lines.append(f"# TYPE {name} histogram")
+            for stage, histogram in histograms:
+                cumulative = 0
+                for bound, count in zip(histogram.bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host='127.0.0.1'):
+        """
+        Inicia um endpoint HTTP local que responde com as métricas em /metrics e com o
+        relatório de memória da instância em /memory.
+
+        :param port: A porta de escuta.
+        :param host: O endereço de escuta; por padrão, apenas local.
+        :return: O servidor HTTP iniciado.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Importado apenas se o endpoint for usado
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.rstrip('/')
+                if path == '/memory':
+                    from utils.memory_probe import memory_probe
+                    body = memory_probe.report_from_thread().encode()
+                elif path in ('', '/metrics'):
+                    body = metrics.render().encode()
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self.server.serve_forever, name="MetricsServer", daemon=True).start()
+        return self.server
+
+    def dump_to_file(self, filename):
+        """
+        Grava as métricas em um arquivo, substituindo-o de forma atômica.
+
+        :param filename: O caminho do arquivo.
+        """
+        temp = f"{filename}.tmp"
+        with open(temp, 'w', encoding='utf-8') as file:
+            file.write(self.render())
+        os.replace(temp, filename)
+
+    def start_file_dump(self, filename, interval):
+        """
+        Inicia uma thread que grava as métricas em um arquivo periodicamente.
+
+        :param filename: O caminho do arquivo.
+        :param interval: O intervalo entre gravações, em segundos.
+        """
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.dump_to_file(filename)
+                except OSError as e:
+                    print(f"Erro ao gravar métricas em {filename}: {e}")
+
+        threading.Thread(target=run, name="MetricsDump", daemon=True).start()
+
+# Instância global da classe Metrics
+metrics_instance = Metrics()
@@ -0,0 +1,55 @@
+import importlib
+import time
+
+class StartupReport:
+    def __init__(self):
+        """
+        Mede o tempo de cada etapa da inicialização, a partir da importação deste módulo
+        (a primeira feita por main.py), até o primeiro quadro exibido.
+        """
+        self.started_at = time.perf_counter()
+        self.last_mark = self.started_at
+        self.phases = []  # (etapa, segundos desde a marca anterior)
+        self.imports = []  # (módulo, segundos) das importações adiadas medidas
+
+    def mark(self, phase):
+        """
+        Encerra uma etapa, registrando o tempo desde a marca anterior.
+
+        :param phase: O nome da etapa.
+        """
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last_mark))
+        self.last_mark = now
+
+    def timed_import(self, module_name):
+        """
+        Importa um módulo registrando quanto tempo a importação levou.
+
+        :param module_name: O nome do módulo.
+        :return: O módulo importado.
+        """
+        started_at = time.perf_counter()
+        module = importlib.import_module(module_name)
+        self.imports.append((module_name, time.perf_counter() - started_at))
+        return module
+
+    def render(self):
+        """
+        Formata o relatório de inicialização.
+
+        :return: O texto do relatório.
+        """
+        lines = ["Tempo de inicialização:"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:<24} {seconds * 1000:8.1f} ms")
+        lines.append(f"  {'total':<24} {(self.last_mark - self.started_at) * 1000:8.1f} ms")
+        if self.imports:
+            lines.append("Importações adiadas:")
+            for module_name, seconds in self.imports:
+                lines.append(f"  {module_name:<24} {seconds * 1000:8.1f} ms")
+        lines.append("Detalhe por módulo: python -X importtime main.py")
+        return "\n".join(lines)
+
+# Instância global do relatório de inicialização
+startup_report = StartupReport()
@@ -0,0 +1,82 @@
+import heapq
+import time
+
+class DeadlineScheduler:
+    def __init__(self, loop, callback):
+        """
+        Inicializa o agendador de prazos, com no máximo um prazo por chave e um único
+        agendamento ativo no loop.
+
+        :param loop: O loop que executa o agendamento (janela Tk, TkLoop ou EventLoop).
+        :param callback: Função chamada com a chave quando o prazo dela expira.
+        """
+        self.loop = loop
+        self.callback = callback
+        self.deadlines = {}
+        self.heap = []
+        self.in_heap = set()
+        self.after_id = None
+        self.armed_deadline = None
+
+    def set(self, key, deadline):
+        """
+        Define (ou adia) o prazo de uma chave.
+
+        Adiar um prazo já agendado custa O(1): a entrada do heap é corrigida apenas quando expira.
+
+        :param key: A chave do prazo.
+        :param deadline: O instante de expiração, em time.monotonic().
+        """
+        self.deadlines[key] = deadline
+        if key not in self.in_heap:
+            self.in_heap.add(key)
+            heapq.heappush(self.heap, (deadline, id(key), key))
+            self.arm()
+
+    def cancel(self, key):
+        """
+        Cancela o prazo de uma chave, se houver.
+
+        :param key: A chave do prazo.
+        """
+        self.deadlines.pop(key, None)
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def arm(self):
+        """
+        Agenda o único after do loop para o prazo mais próximo do heap.
+        """
+        if not self.heap:
+            return
+        deadline = self.heap[0][0]
+        if self.after_id is not None:
+            if self.armed_deadline <= deadline:
+                return
+            self.loop.after_cancel(self.after_id)
+        self.armed_deadline = deadline
+        delay = max(0, int((deadline - time.monotonic()) * 1000))
+        self.after_id = self.loop.after(delay, self.fire)
+
+    def fire(self):
+        """
+        Dispara os prazos expirados e reagenda as entradas que foram adiadas.
+        """
+        self.after_id = None
+        now = time.monotonic()
+        expired = []
+        while self.heap and self.heap[0][0] <= now:
+            _deadline, _tiebreak, key = heapq.heappop(self.heap)
+            actual = self.deadlines.get(key)
+            if actual is None:
+                self.in_heap.discard(key)
+            elif actual > now:
+                heapq.heappush(self.heap, (actual, id(key), key))
+            else:
+                self.in_heap.discard(key)
+                del self.deadlines[key]
+                expired.append(key)
+        self.arm()
+        for key in expired:
+            self.callback(key)